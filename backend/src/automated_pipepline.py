@@ -2,11 +2,12 @@
 Automated Pipeline: Scrape -> Train (if needed) -> Predict -> Pick Best Bets
 """
 
-import pandas as pd
 import os
 import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import subprocess
 
 # Add src to path
 sys.path.append(os.path.dirname(__file__))
@@ -15,6 +16,7 @@ sys.path.append(os.path.dirname(__file__))
 DATA_DIR = '../data/'
 MODELS_DIR = '../models/current/'
 TRAINING_DATA = os.path.join(DATA_DIR, 'processed/training_data.csv')
+TRAINING_DATA_FEATHER = TRAINING_DATA.replace('.csv', '.feather')
 TODAYS_PROPS = os.path.join(DATA_DIR, 'predictions/todays_props.csv')
 TOP_BETS_OUTPUT = os.path.join(DATA_DIR, 'predictions/top_bets.csv')
 ANALYSIS_OUTPUT = os.path.join(DATA_DIR, 'predictions/analysis_results.csv')
@@ -27,19 +29,24 @@ def check_model_freshness():
     """Check if models need retraining"""
     print("\n🔍 Checking model freshness...")
     
-    model_files = ['pts_model.json', 'reb_model.json', 'ast_model.json']
+    from features import latest_model_path
+    
     needs_training = False
+    now = time.time()
     
-    for model_file in model_files:
-        model_path = os.path.join(MODELS_DIR, model_file)
+    for prop in ['pts', 'reb', 'ast']:
+        # Binary UBJ models, falling back to legacy JSON ones
+        model_path = latest_model_path(MODELS_DIR, prop)
+        model_file = os.path.basename(model_path)
         
-        if not os.path.exists(model_path):
+        # One stat call gives both existence and age
+        try:
+            stat_result = os.stat(model_path)
+        except FileNotFoundError:
             print(f"  ❌ Missing: {model_file}")
             needs_training = True
         else:
-            # Check age
-            mod_time = os.path.getmtime(model_path)
-            age_days = (datetime.now().timestamp() - mod_time) / 86400
+            age_days = (now - stat_result.st_mtime) / 86400
             
             if age_days > MODEL_MAX_AGE_DAYS:
                 print(f"  ⚠️ Old: {model_file} ({age_days:.1f} days old)")
@@ -79,16 +86,23 @@ def train_models():
     
     try:
         # Check if training data exists
-        if not os.path.exists(TRAINING_DATA):
+        if not (os.path.exists(TRAINING_DATA) or os.path.exists(TRAINING_DATA_FEATHER)):
             print(f"❌ Training data not found: {TRAINING_DATA}")
             print("ℹ️ Run scraper.py first to collect historical data")
             return False
         
+        # Training overlaps the PrizePicks scrape, so record exactly which training
+        # data snapshot these models come from
+        from features import latest_training_data_path
+        data_path = latest_training_data_path()
+        data_written = datetime.fromtimestamp(os.path.getmtime(data_path)).strftime('%Y-%m-%d %H:%M:%S')
+        print(f"📦 Training data: {data_path} (written {data_written})")
+        
         # Import and run training
         from train import train_all_models
         models, metrics = train_all_models()
         
-        print("✅ Models trained successfully")
+        print(f"✅ Models trained successfully on {data_path} (written {data_written})")
         return True
         
     except Exception as e:
@@ -116,7 +130,6 @@ def generate_predictions():
             
     except Exception as e:
         print(f"❌ Prediction failed: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -127,6 +140,10 @@ def pick_best_bets():
     print("="*60)
     
     try:
+        import numpy as np
+        import pandas as pd
+        from bet_math import compute_edges, confidence_levels, recommendations
+        
         # Load predictions
         if not os.path.exists(ANALYSIS_OUTPUT):
             print(f"❌ No predictions found: {ANALYSIS_OUTPUT}")
@@ -137,38 +154,21 @@ def pick_best_bets():
         print(f"\n📊 Analyzing {len(df)} predictions...")
         
         # Calculate edge and confidence
-        df['edge'] = df['prediction'] - df['line']
-        df['abs_edge'] = df['edge'].abs()
+        edge, abs_edge = compute_edges(df['prediction'].to_numpy(), df['line'].to_numpy())
+        df['edge'] = edge
+        df['abs_edge'] = abs_edge
         
         # Confidence levels based on edge magnitude
-        def get_confidence(abs_edge):
-            if abs_edge >= 5.0:
-                return 'High'
-            elif abs_edge >= 3.0:
-                return 'Medium'
-            else:
-                return 'Low'
-        
-        df['confidence'] = df['abs_edge'].apply(get_confidence)
+        df['confidence'] = confidence_levels(abs_edge)
         
         # Recommendation
-        def get_recommendation(edge):
-            if edge > 0:
-                return 'OVER'
-            elif edge < 0:
-                return 'UNDER'
-            else:
-                return 'PASS'
-        
-        df['recommendation'] = df['edge'].apply(get_recommendation)
+        df['recommendation'] = recommendations(edge)
         
         # Filter for bets with sufficient edge
-        strong_bets = df[df['abs_edge'] >= MIN_EDGE_THRESHOLD].copy()
+        # No copy: strong_bets is only read from, never assigned to
+        strong_bets = df.loc[df['abs_edge'] >= MIN_EDGE_THRESHOLD]
         
-        # Sort by edge magnitude (highest first)
-        strong_bets = strong_bets.sort_values('abs_edge', ascending=False)
-        
-        # Save top bets
+        # Save top bets (unsorted - only the printed top 10 needs ordering)
         strong_bets.to_csv(TOP_BETS_OUTPUT, index=False)
         
         print(f"\n✅ Found {len(strong_bets)} bets with edge >= {MIN_EDGE_THRESHOLD}")
@@ -177,12 +177,22 @@ def pick_best_bets():
             print(f"\n🏆 TOP BETS:")
             print("="*80)
             
-            for idx, row in strong_bets.head(10).iterrows():
-                edge_sign = '+' if row['edge'] > 0 else ''
-                print(f"\n{row['player']} - {row['stat']}")
-                print(f"  Line: {row['line']:.1f} | Prediction: {row['prediction']:.1f}")
-                print(f"  Edge: {edge_sign}{row['edge']:.1f} | Recommendation: {row['recommendation']}")
-                print(f"  Confidence: {row['confidence']}")
+            # Partial sort: select the 10 largest edges in O(n), then order just those
+            top_n = min(10, len(strong_bets))
+            top_idx = np.argpartition(-strong_bets['abs_edge'].to_numpy(), top_n - 1)[:top_n]
+            top = strong_bets.iloc[top_idx].sort_values('abs_edge', ascending=False)
+            lines = []
+            for player, stat, line, prediction, edge, recommendation, confidence in zip(
+                top['player'].to_numpy(), top['stat'].to_numpy(), top['line'].to_numpy(),
+                top['prediction'].to_numpy(), top['edge'].to_numpy(),
+                top['recommendation'].to_numpy(), top['confidence'].to_numpy()
+            ):
+                edge_sign = '+' if edge > 0 else ''
+                lines.append(f"\n{player} - {stat}")
+                lines.append(f"  Line: {line:.1f} | Prediction: {prediction:.1f}")
+                lines.append(f"  Edge: {edge_sign}{edge:.1f} | Recommendation: {recommendation}")
+                lines.append(f"  Confidence: {confidence}")
+            print('\n'.join(lines))
         else:
             print("\n⚠️ No strong bets found today")
         
@@ -191,7 +201,6 @@ def pick_best_bets():
         
     except Exception as e:
         print(f"❌ Bet picking failed: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -202,21 +211,32 @@ def run_full_pipeline(force_retrain=False, visible=False):
     print("#"*60)
     print(f"\n⏰ Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Step 1: Scrape PrizePicks
-    if not scrape_prizepicks(headless=not visible):
-        print("\n❌ Pipeline failed: No props data available")
-        return False
-    
-    # Step 2: Check if training is needed
+    # Check if training is needed up front so Step 2 can overlap with Step 1
     needs_training = force_retrain or check_model_freshness()
     
     if needs_training:
         print("\n🔄 Models need retraining...")
-        if not train_models():
-            print("\n⚠️ Training failed, using existing models...")
     else:
         print("\n✓ Models are fresh, skipping training")
     
+    # Steps 1 & 2: Scrape PrizePicks (network bound) while training runs (CPU bound)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        scrape_future = executor.submit(scrape_prizepicks, headless=not visible)
+        train_future = executor.submit(train_models) if needs_training else None
+        
+        # The scrape is checked before any training output is used downstream
+        scraped = scrape_future.result()
+        trained = train_future.result() if train_future else True
+    
+    if not scraped:
+        if train_future and trained:
+            print("\n⚠️ Models were retrained, but there are no props to predict with them")
+        print("\n❌ Pipeline failed: No props data available")
+        return False
+    
+    if not trained:
+        print("\n⚠️ Training failed, using existing models...")
+    
     # Step 3: Generate predictions
     if not generate_predictions():
         print("\n❌ Pipeline failed: Could not generate predictions")
@@ -0,0 +1,27 @@
+"""
+Bet Math - Vectorized edge, confidence and recommendation logic
+Shared by the dashboard (a few props) and the automated pipeline (a full slate)
+"""
+
+import numpy as np
+
+def compute_edges(predictions, lines):
+    """Return (edges, abs_edges) arrays for predictions vs lines"""
+    edges = np.asarray(predictions, dtype=np.float64) - np.asarray(lines, dtype=np.float64)
+    return edges, np.abs(edges)
+
+def confidence_levels(abs_edges, high=5.0, medium=3.0, labels=('High', 'Medium', 'Low')):
+    """Bucket edge magnitudes into (high, medium, low) confidence labels"""
+    return np.select(
+        [abs_edges >= high, abs_edges >= medium],
+        [labels[0], labels[1]],
+        default=labels[2]
+    )
+
+def recommendations(edges, threshold=0.0, labels=('OVER', 'UNDER', 'PASS')):
+    """Label each edge (over, under, pass); edges smaller than threshold are passes"""
+    return np.select(
+        [np.abs(edges) < threshold, edges > 0, edges < 0],
+        [labels[2], labels[0], labels[1]],
+        default=labels[2]
+    )
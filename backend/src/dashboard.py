@@ -1,10 +1,15 @@
 import streamlit as st
 import pandas as pd
-import xgboost as xgb
 import numpy as np
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from realtime_features import get_realtime_prediction_features
+from itertools import islice
+from bet_math import compute_edges, confidence_levels, recommendations
+from features import (
+    latest_training_data_path, latest_model_path,
+    POINTS_FEATURES, REBOUNDS_FEATURES, ASSISTS_FEATURES
+)
 
 # ==================== CONFIG ====================
 st.set_page_config(
@@ -15,51 +20,57 @@ st.set_page_config(
 )
 
 DATA_PATH = "../data/processed/training_data.csv"
+PARQUET_PATH = DATA_PATH.replace('.csv', '.parquet')  # Binary cache of DATA_PATH
 MODELS_DIR = "../models/current/"
 
-# Load feature sets from train.py
-POINTS_FEATURES = [
-    'L5_PTS', 'L10_PTS', 'SEASON_AVG_PTS', 'L10_PTS_STD', 'RECENT_TREND_PTS',
-    'IS_HOME', 'REST_DAYS', 'IS_BACK_TO_BACK', 'IS_RESTED',
-    'L5_MIN', 'L10_MIN', 'USAGE_RATE', 'FT_RATE', 'PPM_L5', 'PPM_L10',
-    'L5_FG_PCT', 'L5_FG3_PCT', 'L5_FG3M',
-    'L5_REB', 'L5_AST',
-    'VS_OPP_AVG_PTS', 'OPP_DEF_STRENGTH_PTS', 'OPP_PACE', 'TEAM_PACE',
-    'L5_WIN_PCT', 'L5_PLUS_MINUS'
-]
-
-REBOUNDS_FEATURES = [
-    'L5_REB', 'L10_REB', 'L10_REB_STD', 'RECENT_TREND_REB',
-    'IS_HOME', 'REST_DAYS', 'IS_BACK_TO_BACK', 'IS_RESTED',
-    'L5_MIN', 'L10_MIN', 'USAGE_RATE',
-    'L5_PTS', 'L5_AST',
-    'VS_OPP_AVG_REB', 'OPP_DEF_STRENGTH_REB', 'OPP_PACE', 'TEAM_PACE',
-    'L5_WIN_PCT', 'L5_PLUS_MINUS'
-]
-
-ASSISTS_FEATURES = [
-    'L5_AST', 'L10_AST', 'L10_AST_STD', 'RECENT_TREND_AST',
-    'IS_HOME', 'REST_DAYS', 'IS_BACK_TO_BACK', 'IS_RESTED',
-    'L5_MIN', 'L10_MIN', 'USAGE_RATE',
-    'L5_PTS', 'L5_REB',
-    'VS_OPP_AVG_AST', 'OPP_DEF_STRENGTH_AST', 'OPP_PACE', 'TEAM_PACE',
-    'L5_WIN_PCT', 'L5_PLUS_MINUS'
-]
+# Only the training-data columns the dashboard actually reads
+DATA_COLUMNS = ['GAME_DATE', 'PLAYER_NAME', 'OPPONENT', 'MATCHUP', 'PTS', 'REB', 'AST']
+DATA_DTYPES = {'PLAYER_NAME': 'category', 'OPPONENT': 'category', 'MATCHUP': 'string[pyarrow]'}
 
 # ==================== CACHING ====================
+def training_data_key():
+    """(path, mtime) of the current training data; changes whenever it is rewritten"""
+    source_path = latest_training_data_path()
+    return source_path, os.path.getmtime(source_path)
+
 @st.cache_data
-def load_data():
-    """Load training data for player stats lookup"""
-    df = pd.read_csv(DATA_PATH)
-    df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
+def load_data(data_key):
+    """Load training data for player stats lookup (data_key comes from training_data_key)"""
+    # Columnar feather output from features.py needs no caching
+    source_path, _ = data_key
+    if source_path.endswith('.feather'):
+        df = pd.read_feather(source_path, columns=DATA_COLUMNS).astype(DATA_DTYPES)
+        # Files written before features.py pruned categories still carry players with no rows
+        for col in ['PLAYER_NAME', 'OPPONENT']:
+            df[col] = df[col].cat.remove_unused_categories()
+        return df
+    
+    # Reuse the parquet cache if it is newer than the CSV (skips CSV parsing on cold start)
+    if os.path.exists(PARQUET_PATH) and os.path.getmtime(PARQUET_PATH) >= os.path.getmtime(DATA_PATH):
+        return pd.read_parquet(PARQUET_PATH)
+    
+    df = pd.read_csv(
+        DATA_PATH,
+        engine='pyarrow',
+        usecols=DATA_COLUMNS,
+        dtype=DATA_DTYPES,
+        parse_dates=['GAME_DATE']
+    )
+    
+    try:
+        df.to_parquet(PARQUET_PATH, engine='pyarrow', compression='zstd', index=False)
+    except Exception as e:
+        print(f"⚠️ Could not write parquet cache: {e}")
     return df
 
 @st.cache_resource
 def load_models():
     """Load all trained models"""
+    import xgboost as xgb  # Deferred: heavy import only needed once models are loaded
+    
     models = {}
     for prop in ['pts', 'reb', 'ast']:
-        model_path = os.path.join(MODELS_DIR, f"{prop}_model.json")
+        model_path = latest_model_path(MODELS_DIR, prop)
         if os.path.exists(model_path):
             model = xgb.XGBRegressor()
             model.load_model(model_path)
@@ -68,49 +79,101 @@ def load_models():
             st.error(f"Model not found: {model_path}. Please run train.py first!")
     return models
 
+class RealtimeFetchError(Exception):
+    """Raised when real-time features could not be fetched (never cached)"""
+
+@st.cache_data(ttl=900, show_spinner=False)
+def cached_realtime_features(player_name, opponent, is_home, rest_days):
+    """
+    Fetch real-time features, reusing results for identical inputs for 15 minutes
+    
+    A failed fetch raises instead of returning Nones: Streamlit does not cache
+    exceptions, so a timeout or rate limit is retried on the next rerun.
+    """
+    from realtime_features import get_realtime_prediction_features
+    
+    result = get_realtime_prediction_features(
+        player_name,
+        opponent,
+        is_home,
+        rest_days,
+        season=None  # Auto-detect current season
+    )
+    if result[0] is None or result[3] is None:
+        raise RealtimeFetchError(player_name)
+    return result
+
+@st.cache_resource
+def build_latest_index(_df, data_key):
+    """
+    Index training data by player: one row per player holding their latest game
+    
+    Keyed on data_key (from training_data_key) rather than the unhashed _df, so the
+    index is rebuilt when the training data changes.
+    """
+    sorted_df = _df.sort_values('GAME_DATE', ascending=False)
+    return sorted_df.drop_duplicates('PLAYER_NAME').set_index('PLAYER_NAME')
+
+@st.cache_data
+def player_opp_lists(_df, data_key):
+    """
+    Sorted player and opponent options (categorical columns are already sorted)
+    
+    _df is not hashed; data_key (from training_data_key) keys the cache instead, so
+    the lists are rebuilt whenever the training data changes.
+    """
+    def sorted_values(col):
+        if isinstance(_df[col].dtype, pd.CategoricalDtype):
+            return _df[col].cat.categories.tolist()
+        return sorted(_df[col].unique().tolist())
+    
+    return sorted_values('PLAYER_NAME'), sorted_values('OPPONENT')
+
 # ==================== HELPER FUNCTIONS ====================
-def get_player_latest_stats(df, player_name):
+def get_player_latest_stats(latest_index, player_name):
     """Get the most recent game stats for a player"""
-    player_df = df[df['PLAYER_NAME'] == player_name].sort_values('GAME_DATE', ascending=False)
-    
-    if len(player_df) == 0:
+    if player_name not in latest_index.index:
         return None
     
-    return player_df.iloc[0]
+    return latest_index.loc[player_name]
 
-def get_player_opponent_stats(df, player_name, opponent):
-    """Get player's stats against a specific opponent"""
-    player_opp_df = df[
-        (df['PLAYER_NAME'] == player_name) & 
-        (df['OPPONENT'] == opponent)
-    ].sort_values('GAME_DATE', ascending=False)
-    
-    if len(player_opp_df) == 0:
-        return None
-    
-    return player_opp_df
+def predict_all(models, inputs):
+    """Run each prop's booster on its float32 feature row concurrently (XGBoost releases the GIL)"""
+    def predict_one(prop):
+        row = np.asarray(inputs[prop], dtype=np.float32).reshape(1, -1)
+        return prop, models[prop].get_booster().inplace_predict(row)[0]
+    
+    with ThreadPoolExecutor(max_workers=len(inputs)) as executor:
+        return dict(executor.map(predict_one, inputs))
 
-def calculate_confidence_score(prediction, vegas_line):
-    """Calculate confidence score based on prediction vs vegas line"""
-    edge = abs(prediction - vegas_line)
-    
-    if edge < 2:
-        return "🟡 Low Confidence", edge
-    elif edge < 4:
-        return "🟠 Medium Confidence", edge
-    else:
-        return "🟢 High Confidence", edge
+def format_feature_preview(features_dict, n=8):
+    """Format the first n features for display without materializing the full items list"""
+    return {
+        k: f"{v:.2f}" if isinstance(v, (int, float)) else v
+        for k, v in islice(features_dict.items(), n)
+    }
 
-def get_betting_recommendation(prediction, vegas_line, threshold=2.0):
-    """Get betting recommendation"""
-    edge = prediction - vegas_line
-    
-    if abs(edge) < threshold:
-        return "⚪ NO BET", "Edge too small", edge, "neutral"
-    elif edge > 0:
-        return "🔥 BET OVER", f"+{edge:.1f} point edge", edge, "over"
-    else:
-        return "❄️ BET UNDER", f"{edge:.1f} point edge", edge, "under"
+def get_betting_recommendations(predictions, vegas_lines, threshold=2.0):
+    """Get betting recommendations and confidence for several props in one vectorized pass"""
+    edges, abs_edges = compute_edges(predictions, vegas_lines)
+    bet_types = recommendations(edges, threshold, labels=('over', 'under', 'neutral'))
+    confidences = confidence_levels(
+        abs_edges,
+        high=4.0,
+        medium=2.0,
+        labels=("🟢 High Confidence", "🟠 Medium Confidence", "🟡 Low Confidence")
+    )
+    
+    results = []
+    for edge, bet_type, confidence in zip(edges, bet_types, confidences):
+        if bet_type == 'neutral':
+            rec, msg = "⚪ NO BET", "Edge too small"
+        elif bet_type == 'over':
+            rec, msg = "🔥 BET OVER", f"+{edge:.1f} point edge"
+        else:
+            rec, msg = "❄️ BET UNDER", f"{edge:.1f} point edge"
+        results.append((rec, msg, edge, str(bet_type), str(confidence)))
+    return results
 
 # ==================== STREAMLIT APP ====================
 def main():
@@ -161,7 +224,8 @@ def main():
     
     # Load data and models
     with st.spinner("Loading data and models..."):
-        df = load_data()
+        data_key = training_data_key()
+        df = load_data(data_key)
         models = load_models()
     
     if not models:
@@ -172,8 +236,8 @@ def main():
     st.sidebar.header("🎯 Bet Configuration")
     
     # Get unique players and opponents
-    players = sorted(df['PLAYER_NAME'].unique())
-    opponents = sorted(df['OPPONENT'].unique())
+    latest_index = build_latest_index(df, data_key)
+    players, opponents = player_opp_lists(df, data_key)
     
     selected_player = st.sidebar.selectbox(
         "Select Player",
@@ -182,7 +246,7 @@ def main():
     )
     
     # Get player's recent stats
-    latest_stats = get_player_latest_stats(df, selected_player)
+    latest_stats = get_player_latest_stats(latest_index, selected_player)
     
     if latest_stats is None:
         st.error(f"No data found for {selected_player}")
@@ -249,19 +313,21 @@ def main():
     
     # ==================== MAIN CONTENT ====================
     
-    # Fetch REAL-TIME data from NBA API
+    # Fetch REAL-TIME data from NBA API (cached so Vegas line/threshold tweaks don't refetch)
     with st.spinner(f"🔄 Fetching real-time data for {selected_player}..."):
-        pts_features_dict, reb_features_dict, ast_features_dict, recent_games = \
-            get_realtime_prediction_features(
-                selected_player, 
-                selected_opponent, 
-                is_home_value, 
-                rest_days,
-                season=None  # Auto-detect current season
-            )
+        try:
+            pts_features, reb_features, ast_features, recent_games = \
+                cached_realtime_features(
+                    selected_player, 
+                    selected_opponent, 
+                    is_home_value, 
+                    rest_days
+                )
+        except RealtimeFetchError:
+            pts_features = reb_features = ast_features = recent_games = None
     
     # Check if data was fetched successfully
-    if pts_features_dict is None or recent_games is None:
+    if pts_features is None or recent_games is None:
         st.error(f"❌ Could not fetch real-time data for {selected_player}")
         st.warning("**Possible reasons:**")
         st.markdown("""
@@ -273,10 +339,16 @@ def main():
         st.info("💡 **Tip:** Try selecting a different player or wait a moment and refresh")
         return
     
+    # Latest game row (recent_games is sorted most recent first) - extract once and reuse
+    has_games = len(recent_games) > 0
+    if has_games:
+        last_row = recent_games.iloc[0]
+        last_game_date = last_row['GAME_DATE'].strftime('%Y-%m-%d')
+        last_game_pts = last_row['PTS']
+    
     # Show data freshness indicator
-    if len(recent_games) > 0:
-        last_game_date = recent_games.iloc[0]['GAME_DATE'].strftime('%Y-%m-%d')
-        days_ago = (datetime.now() - recent_games.iloc[0]['GAME_DATE']).days
+    if has_games:
+        days_ago = (datetime.now() - last_row['GAME_DATE']).days
         
         st.success(f"✅ Using REAL-TIME data | Last game: {last_game_date} ({days_ago} days ago)")
     
@@ -288,33 +360,37 @@ def main():
         st.markdown(f"**vs {selected_opponent}** | **{is_home}** | **Rest: {rest_days} days**")
     
     with col2:
-        if len(recent_games) > 0:
-            st.metric("Last Game", f"{recent_games.iloc[0]['PTS']:.0f} pts")
+        if has_games:
+            st.metric("Last Game", f"{last_game_pts:.0f} pts")
     
     with col3:
-        if len(recent_games) > 0:
-            last_game_date = recent_games.iloc[0]['GAME_DATE'].strftime('%Y-%m-%d')
+        if has_games:
             st.markdown(f"**Last Game:** {last_game_date}")
     
     st.markdown("---")
     
-    # Get opponent-specific stats from recent games
-    opp_games = recent_games[recent_games['MATCHUP'].str.contains(selected_opponent)]
+    # Get opponent-specific stats from recent games (OPPONENT is attached by realtime_features)
+    opp_games = recent_games[recent_games['OPPONENT'].to_numpy() == selected_opponent]
     
-    # Create DataFrames for prediction
-    pts_input = pd.DataFrame([pts_features_dict])
-    reb_input = pd.DataFrame([reb_features_dict])
-    ast_input = pd.DataFrame([ast_features_dict])
+    # Make predictions straight from the float32 feature vectors
+    preds = predict_all(models, {'PTS': pts_features, 'REB': reb_features, 'AST': ast_features})
     
-    # Make predictions
-    pts_pred = models['PTS'].predict(pts_input)[0]
-    reb_pred = models['REB'].predict(reb_input)[0]
-    ast_pred = models['AST'].predict(ast_input)[0]
+    # Named views of the vectors, for display only
+    pts_features_dict = dict(zip(POINTS_FEATURES, pts_features.tolist()))
+    reb_features_dict = dict(zip(REBOUNDS_FEATURES, reb_features.tolist()))
+    ast_features_dict = dict(zip(ASSISTS_FEATURES, ast_features.tolist()))
+    pts_pred, reb_pred, ast_pred = preds['PTS'], preds['REB'], preds['AST']
     
     # Get recommendations
-    pts_rec, pts_msg, pts_edge, pts_type = get_betting_recommendation(pts_pred, vegas_pts, edge_threshold)
-    reb_rec, reb_msg, reb_edge, reb_type = get_betting_recommendation(reb_pred, vegas_reb, edge_threshold)
-    ast_rec, ast_msg, ast_edge, ast_type = get_betting_recommendation(ast_pred, vegas_ast, edge_threshold)
+    (
+        (pts_rec, pts_msg, pts_edge, pts_type, pts_confidence),
+        (reb_rec, reb_msg, reb_edge, reb_type, reb_confidence),
+        (ast_rec, ast_msg, ast_edge, ast_type, ast_confidence)
+    ) = get_betting_recommendations(
+        [pts_pred, reb_pred, ast_pred],
+        [vegas_pts, vegas_reb, vegas_ast],
+        edge_threshold
+    )
     
     # Display predictions in columns
     st.subheader("🎯 Predictions & Recommendations")
@@ -333,8 +409,7 @@ def main():
         </div>
         """, unsafe_allow_html=True)
         
-        confidence, edge_val = calculate_confidence_score(pts_pred, vegas_pts)
-        st.markdown(f"**Confidence:** {confidence}")
+        st.markdown(f"**Confidence:** {pts_confidence}")
     
     with col2:
         box_class = "over-bet" if reb_type == "over" else "under-bet" if reb_type == "under" else "no-bet"
@@ -348,8 +423,7 @@ def main():
         </div>
         """, unsafe_allow_html=True)
         
-        confidence, edge_val = calculate_confidence_score(reb_pred, vegas_reb)
-        st.markdown(f"**Confidence:** {confidence}")
+        st.markdown(f"**Confidence:** {reb_confidence}")
     
     with col3:
         box_class = "over-bet" if ast_type == "over" else "under-bet" if ast_type == "under" else "no-bet"
@@ -363,8 +437,7 @@ def main():
         </div>
         """, unsafe_allow_html=True)
         
-        confidence, edge_val = calculate_confidence_score(ast_pred, vegas_ast)
-        st.markdown(f"**Confidence:** {confidence}")
+        st.markdown(f"**Confidence:** {ast_confidence}")
     
     st.markdown("---")
     
@@ -415,15 +488,15 @@ def main():
         
         with col1:
             st.markdown("**Points Model Features:**")
-            st.json({k: f"{v:.2f}" if isinstance(v, (int, float)) else v for k, v in list(pts_features_dict.items())[:8]})
+            st.json(format_feature_preview(pts_features_dict))
         
         with col2:
             st.markdown("**Rebounds Model Features:**")
-            st.json({k: f"{v:.2f}" if isinstance(v, (int, float)) else v for k, v in list(reb_features_dict.items())[:8]})
+            st.json(format_feature_preview(reb_features_dict))
         
         with col3:
             st.markdown("**Assists Model Features:**")
-            st.json({k: f"{v:.2f}" if isinstance(v, (int, float)) else v for k, v in list(ast_features_dict.items())[:8]})
+            st.json(format_feature_preview(ast_features_dict))
     
     # Footer
     st.markdown("---")
@@ -1,26 +1,264 @@
 import pandas as pd
 import numpy as np
+import os
+import re
+from glob import glob
 
 INPUT_PATH = '../data/raw/nba_logs.csv'
 OUTPUT_PATH = "../data/processed/training_data.csv"
 
-def get_opponent(matchup):
-    """Extract opponent team from matchup string"""
-    if 'vs.' in matchup: 
-        return matchup.split(' vs. ')[1]
-    elif ' @ ' in matchup: 
-        return matchup.split(' @ ')[1]
-    else: 
-        return 'UNK'
-
-def get_team(matchup):
-    """Extract player's team from matchup string"""
-    if 'vs.' in matchup:
-        return matchup.split(' vs. ')[0]
-    elif ' @ ' in matchup:
-        return matchup.split(' @ ')[0]
+# Columnar (Arrow/Feather) copies - preferred over the CSVs whenever they are newer
+FEATHER_INPUT_PATH = INPUT_PATH.replace('.csv', '.feather')
+FEATHER_OUTPUT_PATH = OUTPUT_PATH.replace('.csv', '.feather')
+
+# Parquet dataset the scrapers write (one zstd part file per scrape run)
+PARQUET_INPUT_DIR = '../data/raw/nba_logs/'
+
+# Only the raw log columns process_data uses
+RAW_COLUMNS = [
+    'Player_ID', 'PLAYER_NAME', 'GAME_DATE', 'MATCHUP', 'WL',
+    'MIN', 'PTS', 'REB', 'AST', 'FGA', 'FTA', 'FG_PCT', 'FG3_PCT', 'FG3M', 'PLUS_MINUS'
+]
+
+# Box-score stats fit comfortably in float32 (half the bytes moved by every rolling pass)
+STAT_DTYPES = {
+    col: np.float32 for col in
+    ['PTS', 'REB', 'AST', 'MIN', 'FGA', 'FTA', 'FG_PCT', 'FG3_PCT', 'FG3M', 'PLUS_MINUS']
+}
+RAW_DTYPES = {'Player_ID': np.int32, **STAT_DTYPES}
+
+# "LAL vs. BOS" (home) / "LAL @ BOS" (away) -> team, opponent
+MATCHUP_RE = re.compile(r'^(.*?) (?:vs\.|@) (.*)$')
+
+# Model inputs per target, in the column order the models are trained on; train.py,
+# realtime_features.py and the dashboard all read these, so edit them only here
+POINTS_FEATURES = [
+    # Core points stats
+    'L5_PTS', 'L10_PTS', 'SEASON_AVG_PTS', 'L10_PTS_STD', 'RECENT_TREND_PTS',
+    
+    # Context
+    'IS_HOME', 'REST_DAYS', 'IS_BACK_TO_BACK', 'IS_RESTED',
+    
+    # Minutes & Usage
+    'L5_MIN', 'L10_MIN', 'USAGE_RATE', 'FT_RATE', 'PPM_L5', 'PPM_L10',
+    
+    # Shooting
+    'L5_FG_PCT', 'L5_FG3_PCT', 'L5_FG3M',
+    
+    # Supporting stats
+    'L5_REB', 'L5_AST',
+    
+    # Matchup
+    'VS_OPP_AVG_PTS', 'OPP_DEF_STRENGTH_PTS', 'OPP_PACE', 'TEAM_PACE',
+    
+    # Advanced
+    'L5_WIN_PCT', 'L5_PLUS_MINUS'
+]
+
+REBOUNDS_FEATURES = [
+    # Core rebounds stats
+    'L5_REB', 'L10_REB', 'L10_REB_STD', 'RECENT_TREND_REB',
+    
+    # Context
+    'IS_HOME', 'REST_DAYS', 'IS_BACK_TO_BACK', 'IS_RESTED',
+    
+    # Minutes & Usage
+    'L5_MIN', 'L10_MIN', 'USAGE_RATE',
+    
+    # Supporting stats
+    'L5_PTS', 'L5_AST',
+    
+    # Matchup
+    'VS_OPP_AVG_REB', 'OPP_DEF_STRENGTH_REB', 'OPP_PACE', 'TEAM_PACE',
+    
+    # Advanced
+    'L5_WIN_PCT', 'L5_PLUS_MINUS'
+]
+
+ASSISTS_FEATURES = [
+    # Core assists stats
+    'L5_AST', 'L10_AST', 'L10_AST_STD', 'RECENT_TREND_AST',
+    
+    # Context
+    'IS_HOME', 'REST_DAYS', 'IS_BACK_TO_BACK', 'IS_RESTED',
+    
+    # Minutes & Usage
+    'L5_MIN', 'L10_MIN', 'USAGE_RATE',
+    
+    # Supporting stats
+    'L5_PTS', 'L5_REB',
+    
+    # Matchup
+    'VS_OPP_AVG_AST', 'OPP_DEF_STRENGTH_AST', 'OPP_PACE', 'TEAM_PACE',
+    
+    # Advanced
+    'L5_WIN_PCT', 'L5_PLUS_MINUS'
+]
+
+def newest_path(feather_path, csv_path):
+    """Return the feather file if it exists and is at least as new as the CSV"""
+    if os.path.exists(feather_path) and (
+        not os.path.exists(csv_path) or os.path.getmtime(feather_path) >= os.path.getmtime(csv_path)
+    ):
+        return feather_path
+    return csv_path
+
+def latest_training_data_path():
+    """Path of the most recently written training data (feather or CSV)"""
+    return newest_path(FEATHER_OUTPUT_PATH, OUTPUT_PATH)
+
+def latest_model_path(models_dir, prop):
+    """Path of a prop's current model: the binary UBJ file, or a legacy JSON one if newer"""
+    base = os.path.join(models_dir, f"{prop.lower()}_model")
+    return newest_path(f"{base}.ubj", f"{base}.json")
+
+def migrate_csv_to_feather():
+    """One-time conversion of the existing raw/processed CSVs to feather"""
+    for csv_path, feather_path in [(INPUT_PATH, FEATHER_INPUT_PATH), (OUTPUT_PATH, FEATHER_OUTPUT_PATH)]:
+        if not os.path.exists(csv_path):
+            print(f"  ⚠️ Skipping missing {csv_path}")
+            continue
+        dtype = RAW_DTYPES if csv_path == INPUT_PATH else None
+        df = pd.read_csv(csv_path, dtype=dtype, parse_dates=['GAME_DATE'], low_memory=False)
+        df.to_feather(feather_path, compression='zstd')
+        print(f"  ✓ {csv_path} -> {feather_path} ({len(df):,} rows)")
+
+def load_raw_logs():
+    """Load raw game logs from the newest of the scraped parquet parts, feather copy or CSV"""
+    path = newest_path(FEATHER_INPUT_PATH, INPUT_PATH)
+    
+    parts = glob(os.path.join(PARQUET_INPUT_DIR, '*.parquet'))
+    if parts and (not os.path.exists(path) or max(map(os.path.getmtime, parts)) >= os.path.getmtime(path)):
+        print(f"Loading raw data from {PARQUET_INPUT_DIR} ({len(parts)} parts)...")
+        df = pd.read_parquet(PARQUET_INPUT_DIR, columns=RAW_COLUMNS)
+        df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
+        return df.astype(RAW_DTYPES)
+    
+    print(f"Loading raw data from {path}...")
+    if path.endswith('.feather'):
+        return pd.read_feather(path, columns=RAW_COLUMNS).astype(RAW_DTYPES)
+    return pd.read_csv(
+        path,
+        usecols=RAW_COLUMNS,
+        dtype=RAW_DTYPES,
+        parse_dates=['GAME_DATE'],
+        low_memory=False
+    )
+
+def parse_matchups(matchups):
+    """
+    Split matchup strings ("LAL vs. BOS" / "LAL @ BOS") into team, opponent and home flag
+    
+    There are only a couple of thousand distinct matchups, so the regex runs once per
+    unique string and the results are broadcast back by factorize code. Unparseable or
+    missing matchups get 'UNK' team and opponent.
+    """
+    codes, uniques = pd.factorize(matchups)
+    unique_matchups = pd.Series(uniques, dtype=object)
+    parts = unique_matchups.str.extract(MATCHUP_RE)
+    
+    # A trailing sentinel catches code -1 (missing matchup)
+    def broadcast(values, missing):
+        return pd.Series(np.append(values, missing)[codes], index=matchups.index)
+    
+    team = broadcast(parts[0].fillna('UNK').to_numpy(), 'UNK')
+    opponent = broadcast(parts[1].fillna('UNK').to_numpy(), 'UNK')
+    is_home = broadcast(unique_matchups.str.contains('vs.', regex=False).to_numpy(dtype=np.int8), 0)
+    return team, opponent, is_home.astype(np.int8)
+
+def previous_games(df, group, keys, cols):
+    """
+    Group each row's previous-game values (shift(1) within group) by the same keys
+    
+    Shifting once up front keeps the current game out of every window built on
+    the returned groupby, so it can be reused for all rolling/expanding features.
+    """
+    shifted = group[cols].shift(1)
+    key_values = [df[k] for k in keys] if isinstance(keys, list) else df[keys]
+    return shifted.groupby(key_values, sort=False, observed=True)
+
+def shifted_rolling(prev_group, col, window=None, min_periods=1, stat='mean'):
+    """
+    Rolling stat over each group's previous games (native groupby-rolling, no lambda)
+    
+    prev_group comes from previous_games(); window=None gives an expanding window.
+    col may be a list of columns to compute them all in one pass (returns a DataFrame).
+    """
+    if window is None:
+        windowed = prev_group[col].expanding(min_periods=min_periods)
     else:
-        return 'UNK'
+        windowed = prev_group[col].rolling(window, min_periods=min_periods)
+    result = getattr(windowed, stat)()
+    # Drop the group key level(s) so the result aligns with the original index
+    return result.reset_index(level=list(range(result.index.nlevels - 1)), drop=True)
+
+def group_row_starts(*keys):
+    """Position of the first row of each row's group (groups must be contiguous, e.g. sorted)"""
+    keys = [np.asarray(k) for k in keys]
+    positions = np.arange(len(keys[0]))
+    is_start = np.ones(len(positions), dtype=bool)
+    is_start[1:] = np.logical_or.reduce([k[1:] != k[:-1] for k in keys])
+    return np.maximum.accumulate(np.where(is_start, positions, 0))
+
+def grouped_window_stats(values, row_start, windows):
+    """
+    Mean/std over each row's previous games for several windows in one sweep
+    
+    Running sums (value, square, count) are built once per column and every window
+    is read off them by subtracting the sum at the window start, so extra windows
+    cost O(n) with no per-window re-sum. windows maps name -> (window, min_periods,
+    stat) with window=None for expanding; NaNs are skipped like pandas rolling.
+    """
+    n = len(values)
+    positions = np.arange(n)
+    
+    # Previous game's value within the group (the current game never enters a window)
+    prev = np.empty(n, dtype=np.float64)
+    prev[0] = np.nan
+    prev[1:] = np.asarray(values, dtype=np.float64)[:-1]
+    prev[row_start == positions] = np.nan
+    
+    valid = ~np.isnan(prev)
+    filled = np.where(valid, prev, 0.0)
+    sums = np.concatenate(([0.0], np.cumsum(filled)))
+    squares = np.concatenate(([0.0], np.cumsum(filled * filled)))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    
+    end = positions + 1
+    results = {}
+    for name, (window, min_periods, stat) in windows.items():
+        start = row_start if window is None else np.maximum(end - window, row_start)
+        count = counts[end] - counts[start]
+        total = sums[end] - sums[start]
+        enough = count >= max(min_periods, 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if stat == 'mean':
+                result = total / count
+            else:
+                # Sample std (ddof=1) like pandas; clip tiny negative round-off
+                variance = (squares[end] - squares[start] - total * total / count) / (count - 1)
+                result = np.sqrt(np.clip(variance, 0.0, None))
+                enough &= count >= 2
+        results[name] = np.where(enough, result, np.nan)
+    return results
+
+def group_windows(values, row_start, windows, order=None):
+    """
+    grouped_window_stats() for one stat column, returned in the frame's row order
+    
+    order gives the row positions in group order when the frame itself isn't sorted
+    that way; results are scattered back to those positions.
+    """
+    values = np.asarray(values)
+    if order is None:
+        return grouped_window_stats(values, row_start, windows)
+    
+    results = {}
+    for name, result in grouped_window_stats(values[order], row_start, windows).items():
+        scattered = np.empty_like(result)
+        scattered[order] = result
+        results[name] = scattered
+    return results
 
 def clean_outliers(df):
     """Remove bad data and handle outliers"""
@@ -28,144 +266,145 @@ def clean_outliers(df):
     initial_rows = len(df)
     
     # Remove games with very low minutes (likely DNPs or garbage time)
-    df = df[df['MIN'] > 5].copy()
-    
-    # Remove statistical anomalies
-    df = df[df['PTS'] < 70].copy()
-    df = df[df['REB'] < 30].copy()
-    df = df[df['AST'] < 25].copy()
+    # and statistical anomalies, in one mask; take() gathers the kept rows into a
+    # new frame once (no extra .copy(), and later in-place edits don't warn)
+    keep = (df['MIN'] > 5) & (df['PTS'] < 70) & (df['REB'] < 30) & (df['AST'] < 25)
+    df = df.take(np.flatnonzero(keep.to_numpy()))
     
     # Cap extreme rest days (7+ days treated the same)
     df['REST_DAYS'] = df['REST_DAYS'].clip(0, 7)
     
     # Replace infinity values with NaN
-    df = df.replace([np.inf, -np.inf], np.nan)
+    df.replace([np.inf, -np.inf], np.nan, inplace=True)
     
     print(f"  Removed {initial_rows - len(df)} outlier rows")
     return df
 
-def process_data():
-    print(f"Loading raw data from {INPUT_PATH}...")
-    df = pd.read_csv(INPUT_PATH)
+def process_data(output_format='feather'):
+    df = load_raw_logs()
     
     print(f"  Loaded {len(df)} rows")
     
-    # 1. DATA CLEANING
-    df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
-    df = df.sort_values(['Player_ID', 'GAME_DATE']).reset_index(drop=True)
+    # 1. DATA CLEANING (GAME_DATE is already parsed by load_raw_logs)
+    # Stable lexsort on the raw int64 keys (last key is the primary sort)
+    date_keys = df['GAME_DATE'].to_numpy().view(np.int64)
+    df = df.iloc[np.lexsort((date_keys, df['Player_ID'].to_numpy()))].reset_index(drop=True)
     
     # Extract team and opponent info
-    df['OPPONENT'] = df['MATCHUP'].apply(get_opponent)
-    df['TEAM'] = df['MATCHUP'].apply(get_team)
-    df['IS_HOME'] = df['MATCHUP'].apply(lambda x: 1 if 'vs.' in x else 0)
+    df['TEAM'], df['OPPONENT'], df['IS_HOME'] = parse_matchups(df['MATCHUP'])
+    
+    # Group keys as categoricals: groupbys hash small int codes instead of strings
+    for col in ['OPPONENT', 'TEAM', 'PLAYER_NAME', 'MATCHUP']:
+        df[col] = df[col].astype('category')
     
     # 2. FEATURE ENGINEERING
+    # Features are collected here and joined to df in one concat at the end, rather
+    # than inserted one column at a time (which fragments the frame)
+    features = {}
+    
     print("Calculating player-level features...")
-    player_group = df.groupby('Player_ID')
+    # Build each groupby once per sort order (df is already sorted, so skip the group sort)
+    player_group = df.groupby('Player_ID', sort=False)
+    player_starts = group_row_starts(df['Player_ID'])
     
     # === TIER 1: BASIC ROLLING STATS ===
-    # Points
-    df['L5_PTS'] = player_group['PTS'].transform(lambda x: x.shift(1).rolling(5, min_periods=3).mean())
-    df['L10_PTS'] = player_group['PTS'].transform(lambda x: x.shift(1).rolling(10, min_periods=5).mean())
-    df['SEASON_AVG_PTS'] = player_group['PTS'].transform(lambda x: x.shift(1).expanding().mean())
+    # Points (L10 std for TIER 2 volatility comes from the same running sums)
+    features.update(group_windows(df['PTS'], player_starts, {
+        'L5_PTS': (5, 3, 'mean'),
+        'L10_PTS': (10, 5, 'mean'),
+        'SEASON_AVG_PTS': (None, 1, 'mean'),
+        'L10_PTS_STD': (10, 5, 'std'),
+    }))
     
     # Rebounds & Assists
-    df['L5_REB'] = player_group['REB'].transform(lambda x: x.shift(1).rolling(5, min_periods=3).mean())
-    df['L10_REB'] = player_group['REB'].transform(lambda x: x.shift(1).rolling(10, min_periods=5).mean())
-    df['L5_AST'] = player_group['AST'].transform(lambda x: x.shift(1).rolling(5, min_periods=3).mean())
-    df['L10_AST'] = player_group['AST'].transform(lambda x: x.shift(1).rolling(10, min_periods=5).mean())
+    features.update(group_windows(df['REB'], player_starts, {
+        'L5_REB': (5, 3, 'mean'),
+        'L10_REB': (10, 5, 'mean'),
+        'L10_REB_STD': (10, 5, 'std'),
+    }))
+    features.update(group_windows(df['AST'], player_starts, {
+        'L5_AST': (5, 3, 'mean'),
+        'L10_AST': (10, 5, 'mean'),
+        'L10_AST_STD': (10, 5, 'std'),
+    }))
     
     # === TIER 2: VOLATILITY & CONSISTENCY ===
-    df['L10_PTS_STD'] = player_group['PTS'].transform(lambda x: x.shift(1).rolling(10, min_periods=5).std())
-    df['L10_REB_STD'] = player_group['REB'].transform(lambda x: x.shift(1).rolling(10, min_periods=5).std())
-    df['L10_AST_STD'] = player_group['AST'].transform(lambda x: x.shift(1).rolling(10, min_periods=5).std())
-    
     # Recent trend (hot or cold?)
-    df['RECENT_TREND_PTS'] = df['L5_PTS'] - df['L10_PTS']
-    df['RECENT_TREND_REB'] = df['L5_REB'] - df['L10_REB']
-    df['RECENT_TREND_AST'] = df['L5_AST'] - df['L10_AST']
+    features['RECENT_TREND_PTS'] = features['L5_PTS'] - features['L10_PTS']
+    features['RECENT_TREND_REB'] = features['L5_REB'] - features['L10_REB']
+    features['RECENT_TREND_AST'] = features['L5_AST'] - features['L10_AST']
     
     # === TIER 3: MINUTES & USAGE ===
-    df['L5_MIN'] = player_group['MIN'].transform(lambda x: x.shift(1).rolling(5, min_periods=3).mean())
-    df['L10_MIN'] = player_group['MIN'].transform(lambda x: x.shift(1).rolling(10, min_periods=5).mean())
-    df['L5_FGA'] = player_group['FGA'].transform(lambda x: x.shift(1).rolling(5, min_periods=3).mean())
-    df['L5_FTA'] = player_group['FTA'].transform(lambda x: x.shift(1).rolling(5, min_periods=3).mean())
+    features.update(group_windows(df['MIN'], player_starts, {'L5_MIN': (5, 3, 'mean'), 'L10_MIN': (10, 5, 'mean')}))
+    features.update(group_windows(df['FGA'], player_starts, {'L5_FGA': (5, 3, 'mean')}))
+    features.update(group_windows(df['FTA'], player_starts, {'L5_FTA': (5, 3, 'mean')}))
     
     # Usage rate (shot attempts per minute)
-    df['USAGE_RATE'] = df['L5_FGA'] / (df['L5_MIN'] + 0.1)  # Add 0.1 to avoid division by zero
-    df['FT_RATE'] = df['L5_FTA'] / (df['L5_MIN'] + 0.1)
+    features['USAGE_RATE'] = features['L5_FGA'] / (features['L5_MIN'] + 0.1)  # Add 0.1 to avoid division by zero
+    features['FT_RATE'] = features['L5_FTA'] / (features['L5_MIN'] + 0.1)
     
     # Points per minute efficiency
-    df['PPM_L5'] = df['L5_PTS'] / (df['L5_MIN'] + 0.1)
-    df['PPM_L10'] = df['L10_PTS'] / (df['L10_MIN'] + 0.1)
+    features['PPM_L5'] = features['L5_PTS'] / (features['L5_MIN'] + 0.1)
+    features['PPM_L10'] = features['L10_PTS'] / (features['L10_MIN'] + 0.1)
     
     # === TIER 4: GAME CONTEXT & REST ===
-    df['REST_DAYS'] = player_group['GAME_DATE'].diff().dt.days - 1
-    df['DAYS_SINCE_LAST'] = player_group['GAME_DATE'].diff().dt.days
-    df['IS_BACK_TO_BACK'] = (df['DAYS_SINCE_LAST'] == 1).astype(int)
-    df['IS_RESTED'] = (df['REST_DAYS'] >= 2).astype(int)
+    days_since_last = player_group['GAME_DATE'].diff().dt.days
+    features['REST_DAYS'] = days_since_last - 1
+    features['DAYS_SINCE_LAST'] = days_since_last
+    features['IS_BACK_TO_BACK'] = (days_since_last == 1).astype(np.int8)
+    features['IS_RESTED'] = (features['REST_DAYS'] >= 2).astype(np.int8)
     
     # === TIER 5: SHOOTING EFFICIENCY ===
-    df['L5_FG_PCT'] = player_group['FG_PCT'].transform(lambda x: x.shift(1).rolling(5, min_periods=3).mean())
-    df['L5_FG3_PCT'] = player_group['FG3_PCT'].transform(lambda x: x.shift(1).rolling(5, min_periods=3).mean())
-    df['L5_FG3M'] = player_group['FG3M'].transform(lambda x: x.shift(1).rolling(5, min_periods=3).mean())
+    features.update(group_windows(df['FG_PCT'], player_starts, {'L5_FG_PCT': (5, 3, 'mean')}))
+    features.update(group_windows(df['FG3_PCT'], player_starts, {'L5_FG3_PCT': (5, 3, 'mean')}))
+    features.update(group_windows(df['FG3M'], player_starts, {'L5_FG3M': (5, 3, 'mean')}))
     
     # === TIER 6: MATCHUP HISTORY ===
     print("Calculating matchup-specific features...")
-    df['VS_OPP_AVG_PTS'] = df.groupby(['Player_ID', 'OPPONENT'])['PTS'].transform(
-        lambda x: x.shift(1).expanding().mean()
-    )
-    df['VS_OPP_AVG_REB'] = df.groupby(['Player_ID', 'OPPONENT'])['REB'].transform(
-        lambda x: x.shift(1).expanding().mean()
-    )
-    df['VS_OPP_AVG_AST'] = df.groupby(['Player_ID', 'OPPONENT'])['AST'].transform(
-        lambda x: x.shift(1).expanding().mean()
+    # ~36k player/opponent pairs: walk them with the running-sum kernel in pair
+    # order (stable sort keeps dates ordered) instead of a per-group expanding window
+    opponent_codes = df['OPPONENT'].cat.codes.to_numpy()
+    matchup_order = np.lexsort((opponent_codes, df['Player_ID'].to_numpy()))
+    matchup_starts = group_row_starts(
+        df['Player_ID'].to_numpy()[matchup_order], opponent_codes[matchup_order]
     )
+    for col in ['PTS', 'REB', 'AST']:
+        features.update(group_windows(
+            df[col], matchup_starts, {f'VS_OPP_AVG_{col}': (None, 1, 'mean')}, matchup_order
+        ))
+    
+    # === TIER 8: WIN/LOSS MOMENTUM ===
+    wins = (df['WL'] == 'W').astype(np.int8)
+    features.update(group_windows(wins, player_starts, {'L5_WIN_PCT': (5, 3, 'mean')}))
+    
+    # === TIER 9: ADVANCED STATS ===
+    features.update(group_windows(df['PLUS_MINUS'], player_starts, {'L5_PLUS_MINUS': (5, 3, 'mean')}))
+    
+    # Team pace (computed in player/date order, like the other player-sorted features)
+    team_group = df.groupby('TEAM', sort=False, observed=True)
+    team_prev = previous_games(df, team_group, 'TEAM', ['FGA'])
+    features['TEAM_PACE'] = shifted_rolling(team_prev, 'FGA', 20, 5)
     
     # === TIER 7: TEAM & OPPONENT METRICS ===
     print("Calculating team and opponent metrics...")
     
-    # Sort by opponent to calculate defensive metrics
-    df = df.sort_values(['OPPONENT', 'GAME_DATE']).reset_index(drop=True)
-    opp_group = df.groupby('OPPONENT')
+    # Walk games in opponent/date order without re-sorting df: gather just the needed
+    # columns in that order, and let the results align back to df by index
+    opp_order = df.index[np.lexsort((df['GAME_DATE'].to_numpy().view(np.int64), opponent_codes))]
+    opp_df = df.loc[opp_order, ['OPPONENT', 'PTS', 'REB', 'AST', 'FGA']]
+    opp_group = opp_df.groupby('OPPONENT', sort=False, observed=True)
+    opp_prev = previous_games(opp_df, opp_group, 'OPPONENT', ['PTS', 'REB', 'AST', 'FGA'])
     
     # Opponent defensive strength (average points allowed)
-    df['OPP_DEF_STRENGTH_PTS'] = opp_group['PTS'].transform(
-        lambda x: x.shift(1).rolling(window=30, min_periods=5).mean()
-    )
-    df['OPP_DEF_STRENGTH_REB'] = opp_group['REB'].transform(
-        lambda x: x.shift(1).rolling(window=30, min_periods=5).mean()
-    )
-    df['OPP_DEF_STRENGTH_AST'] = opp_group['AST'].transform(
-        lambda x: x.shift(1).rolling(window=30, min_periods=5).mean()
-    )
+    features['OPP_DEF_STRENGTH_PTS'] = shifted_rolling(opp_prev, 'PTS', 30, 5)
+    features['OPP_DEF_STRENGTH_REB'] = shifted_rolling(opp_prev, 'REB', 30, 5)
+    features['OPP_DEF_STRENGTH_AST'] = shifted_rolling(opp_prev, 'AST', 30, 5)
     
     # Opponent pace (field goal attempts as proxy)
-    df['OPP_PACE'] = opp_group['FGA'].transform(
-        lambda x: x.shift(1).rolling(window=20, min_periods=5).mean()
-    )
-    
-    # Sort back by player and date
-    df = df.sort_values(['Player_ID', 'GAME_DATE']).reset_index(drop=True)
-    
-    # Team pace
-    team_group = df.groupby('TEAM')
-    df['TEAM_PACE'] = team_group['FGA'].transform(
-        lambda x: x.shift(1).rolling(window=20, min_periods=5).mean()
-    )
+    features['OPP_PACE'] = shifted_rolling(opp_prev, 'FGA', 20, 5)
     
-    # === TIER 8: WIN/LOSS MOMENTUM ===
-    # Recreate player_group after sorting
-    player_group = df.groupby('Player_ID')
-    df['WL_BINARY'] = (df['WL'] == 'W').astype(int)
-    df['L5_WIN_PCT'] = player_group['WL_BINARY'].transform(
-        lambda x: x.shift(1).rolling(5, min_periods=3).mean()
-    )
-    
-    # === TIER 9: ADVANCED STATS ===
-    df['L5_PLUS_MINUS'] = player_group['PLUS_MINUS'].transform(
-        lambda x: x.shift(1).rolling(5, min_periods=3).mean()
-    )
+    # Series results align to df by index; plain arrays are already in row order
+    df = pd.concat([df, pd.DataFrame(features, index=df.index)], axis=1)
     
     # 3. DATA CLEANING & VALIDATION
     df = clean_outliers(df)
@@ -173,12 +412,11 @@ def process_data():
     # Handle missing values intelligently
     print("Handling missing values...")
     
-    # Fill opponent metrics with global averages if missing
+    # Fill opponent metrics with per-opponent averages if missing
+    opponent_group = df.groupby('OPPONENT', sort=False, observed=True)
     for col in ['OPP_DEF_STRENGTH_PTS', 'OPP_DEF_STRENGTH_REB', 'OPP_DEF_STRENGTH_AST', 'OPP_PACE']:
         if col in df.columns:
-            df[col] = df.groupby('OPPONENT')[col].transform(
-                lambda x: x.fillna(x.mean())
-            )
+            df[col] = df[col].fillna(opponent_group[col].transform('mean'))
     
     # Fill matchup history with player's overall average if no history
     df['VS_OPP_AVG_PTS'] = df['VS_OPP_AVG_PTS'].fillna(df['SEASON_AVG_PTS'])
@@ -189,6 +427,13 @@ def process_data():
     critical_features = ['L10_PTS', 'L10_MIN', 'REST_DAYS', 'OPP_DEF_STRENGTH_PTS']
     df = df.dropna(subset=critical_features)
     
+    # Rows were dropped after the categorical cast; prune the categories only those rows
+    # used so readers (e.g. the dashboard's player list) only see values that have rows
+    df = df.assign(**{
+        col: df[col].cat.remove_unused_categories()
+        for col in df.select_dtypes('category').columns
+    })
+    
     # 4. FINAL OUTPUT
     final_cols = [
         # Metadata
@@ -228,8 +473,18 @@ def process_data():
         'PTS', 'REB', 'AST'
     ]
     
-    final_df = df[final_cols].copy()
-    final_df.to_csv(OUTPUT_PATH, index=False)
+    # One hashtable probe for all column positions, then a positional take (which
+    # already returns a new frame, so no extra copy)
+    col_idx = df.columns.get_indexer(final_cols)
+    if (col_idx < 0).any():
+        raise KeyError(f"Missing feature columns: {[c for c, i in zip(final_cols, col_idx) if i < 0]}")
+    final_df = df.iloc[:, col_idx]
+    if output_format == 'csv':
+        output_path = OUTPUT_PATH
+        final_df.to_csv(output_path, index=False)
+    else:
+        output_path = FEATHER_OUTPUT_PATH
+        final_df.to_feather(output_path, compression='zstd')
     
     print("\n" + "="*50)
     print(f"✅ SUCCESS! Feature Engineering Complete")
@@ -238,8 +493,20 @@ def process_data():
     print(f"  Total Features: {len(final_cols) - 6}")  # Minus metadata and targets
     print(f"  Date Range: {final_df['GAME_DATE'].min()} to {final_df['GAME_DATE'].max()}")
     print(f"  Unique Players: {final_df['PLAYER_NAME'].nunique()}")
-    print(f"  Saved to: {OUTPUT_PATH}")
+    print(f"  Saved to: {output_path}")
     print("="*50)
 
 if __name__ == "__main__":
-    process_data()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Build training features from raw NBA game logs')
+    parser.add_argument('--format', choices=['feather', 'csv'], default='feather',
+                       help='Output format for the training data (csv for external consumers)')
+    parser.add_argument('--migrate', action='store_true',
+                       help='Convert the existing raw/processed CSVs to feather and exit')
+    args = parser.parse_args()
+    
+    if args.migrate:
+        migrate_csv_to_feather()
+    else:
+        process_data(output_format=args.format)
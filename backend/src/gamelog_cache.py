@@ -0,0 +1,118 @@
+"""
+Game Log Cache - Disk-backed memoization of NBA API player game logs
+Shared by the scrapers and the real-time feature builder
+"""
+
+import os
+import time
+import threading
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from nba_api.stats.endpoints import playergamelog
+from nba_api.stats.library.http import NBAStatsHTTP
+
+# Configuration
+CACHE_DIR = '../data/cache/gamelogs/'
+CACHE_TTL_SECONDS = 6 * 3600  # Game logs only change once a day
+
+# Game log columns any consumer reads (scrapers and real-time features); the API
+# returns ~27, the rest are dropped before a DataFrame is ever built
+GAMELOG_COLUMNS = [
+    'Player_ID', 'GAME_DATE', 'MATCHUP', 'WL',
+    'MIN', 'PTS', 'REB', 'AST', 'FGA', 'FTA', 'FG_PCT', 'FG3_PCT', 'FG3M', 'PLUS_MINUS'
+]
+
+_session_lock = threading.RLock()
+_session = None
+
+def configure_http_session(pool_size=1):
+    """
+    Give nba_api one shared keep-alive, compressed session for every game log request
+    
+    nba_api creates its session lazily (racy when several threads make their first
+    call at once). The adapter's pool is sized to pool_size concurrent fetchers, so
+    each thread keeps reusing its TLS connection instead of having it discarded when
+    the pool is full. Calling it again replaces the session (e.g. to resize the pool).
+    """
+    global _session
+    session = requests.Session()
+    session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+    session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    with _session_lock:
+        _session = session
+        NBAStatsHTTP.set_session(session)
+    return session
+
+def ensure_http_session():
+    """Install the shared session on first use unless a caller already configured one"""
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                configure_http_session()
+
+def gamelog_frame(result_set, columns=GAMELOG_COLUMNS):
+    """
+    Build a DataFrame of just the needed columns from a raw {'headers', 'rowSet'} result
+    
+    Skips nba_api's get_data_frames, which materializes every column of the response.
+    """
+    headers = result_set['headers']
+    rows = result_set['rowSet']
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    
+    # Transpose once, then keep only the wanted column tuples
+    values = list(zip(*rows))
+    return pd.DataFrame({col: values[headers.index(col)] for col in columns})
+
+def cache_path(player_id, season):
+    """Cache file for one (player_id, season) game log"""
+    return os.path.join(CACHE_DIR, f"{player_id}_{season}.pkl")
+
+def load_cached_gamelog(player_id, season, ttl=CACHE_TTL_SECONDS):
+    """Return the cached game log if it is younger than ttl seconds, else None"""
+    path = cache_path(player_id, season)
+    try:
+        if time.time() - os.stat(path).st_mtime > ttl:
+            return None
+        df = pd.read_pickle(path)
+        # Entries written before the WL_W flag existed are treated as misses
+        return df if 'WL_W' in df else None
+    except Exception:
+        # Missing or unreadable cache entry: just refetch
+        return None
+
+def fetch_gamelog(player_id, season, timeout=30, ttl=CACHE_TTL_SECONDS, before_request=None):
+    """
+    Fetch a player's game log for a season, served from the disk cache when fresh
+    
+    before_request is called right before a real API request (e.g. a rate limiter),
+    so cache hits skip it. API errors propagate and are never cached.
+    """
+    df = load_cached_gamelog(player_id, season, ttl)
+    if df is not None:
+        return df
+    
+    ensure_http_session()
+    if before_request:
+        before_request()
+    gamelog = playergamelog.PlayerGameLog(
+        player_id=player_id,
+        season=season,
+        timeout=timeout
+    )
+    df = gamelog_frame(gamelog.get_dict()['resultSets'][0])
+    # Win flag computed once at fetch time, so consumers average uint8s, not strings
+    df['WL_W'] = (df['WL'] == 'W').astype('uint8')
+    
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = f"{cache_path(player_id, season)}.{os.getpid()}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path(player_id, season))
+    except Exception as e:
+        print(f"⚠️ Could not cache game log for {player_id} {season}: {e}")
+    
+    return df
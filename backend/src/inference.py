@@ -1,10 +1,21 @@
 import xgboost as xgb
-import pandas as pd
 import numpy as np
 import os
+from features import latest_model_path, POINTS_FEATURES
 
 # --- CONFIG ---
-MODEL_PATH = "../models/current/pts_model.json"
+MODEL_PATH = latest_model_path("../models/current/", 'pts')  # UBJ, or a legacy JSON model
+
+# Friendlier prompts for the common inputs; any other POINTS_FEATURES column is asked by name
+PROMPTS = {
+    'L5_PTS': "Last 5 Games Avg Points (L5_PTS): ",
+    'L10_PTS': "Last 10 Games Avg Points (L10_PTS): ",
+    'SEASON_AVG_PTS': "Season Average Points (SEASON_AVG_PTS): ",
+    'L5_REB': "Last 5 Games Avg Rebounds (L5_REB): ",
+    'L5_AST': "Last 5 Games Avg Assists (L5_AST): ",
+    'REST_DAYS': "Days Rest (0, 1, 2, 3+): ",
+    'IS_HOME': "Home Game? (1 for Yes, 0 for No): ",
+}
 
 def load_model():
     # Check if model exists
@@ -13,10 +24,11 @@ def load_model():
         print("Did you run train.py?")
         return None
     
-    # Load the XGBoost Regressor
-    model = xgb.XGBRegressor()
-    model.load_model(MODEL_PATH)
-    return model
+    # Load the raw Booster once; single-row predictions shouldn't fan out threads
+    booster = xgb.Booster()
+    booster.load_model(MODEL_PATH)
+    booster.set_param({'nthread': 1})
+    return booster
 
 def predict_player(model):
     print("\n--- 🏀 PLAYER PREDICTOR ---")
@@ -24,27 +36,14 @@ def predict_player(model):
     
     # 1. Collect Inputs (Simulating an upcoming game)
     try:
-        l5_pts = float(input("Last 5 Games Avg Points (L5_PTS): "))
-        l10_pts = float(input("Last 10 Games Avg Points (L10_PTS): "))
-        season_avg = float(input("Season Average Points (SEASON_AVG_PTS): "))
-        l5_reb = float(input("Last 5 Games Avg Rebounds (L5_REB): "))
-        l5_ast = float(input("Last 5 Games Avg Assists (L5_AST): "))
-        rest_days = float(input("Days Rest (0, 1, 2, 3+): "))
-        is_home = int(input("Home Game? (1 for Yes, 0 for No): "))
+        # The points model takes every POINTS_FEATURES column, asked in that order
+        values = [float(input(PROMPTS.get(name, f"{name}: "))) for name in POINTS_FEATURES]
         
-        # 2. Create DataFrame (Must match the training columns EXACTLY)
-        input_data = pd.DataFrame({
-            'L5_PTS': [l5_pts],
-            'L10_PTS': [l10_pts],
-            'SEASON_AVG_PTS': [season_avg],
-            'L5_REB': [l5_reb],
-            'L5_AST': [l5_ast],
-            'REST_DAYS': [rest_days],
-            'IS_HOME': [is_home]
-        })
+        # 2. Build the feature row in the column order the model was trained on
+        input_data = np.array([values], dtype=np.float32)
         
-        # 3. Predict
-        prediction = model.predict(input_data)[0]
+        # 3. Predict straight from the numpy row (no DataFrame/DMatrix round-trip)
+        prediction = float(model.inplace_predict(input_data)[0])
         
         print("\n" + "="*30)
         print(f"🔮 PREDICTED POINTS: {prediction:.1f}")
@@ -1,13 +1,16 @@
 """
 PrizePicks Scraper - Automated prop collection for NBA
-Uses undetected-chromedriver to bypass bot detection
+Reads PrizePicks' public projections JSON API; falls back to
+undetected-chromedriver (to bypass bot detection) if the API fails
 """
 
-import undetected_chromedriver as uc
+import requests
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import pandas as pd
+import numpy as np
+import re
 import time
 import random
 from datetime import datetime
@@ -16,11 +19,101 @@ import os
 # Configuration
 OUTPUT_PATH = '../data/predictions/todays_props.csv'
 PRIZEPICKS_URL = 'https://app.prizepicks.com/'
+PRIZEPICKS_API_URL = 'https://api.prizepicks.com/projections'
+NBA_LEAGUE_ID = 7
 TARGET_SPORT = 'NBA'  # Focus on NBA
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Scrapers return props as tuples in this column order
+PROP_COLUMNS = ['player', 'stat', 'line', 'stat_mapped', 'source', 'timestamp']
+
+# Stat keywords, matched as case-insensitive substrings in one regex scan
+STAT_KEYWORD_RE = re.compile(r'point|pts|rebound|reb|assist|ast|block|blk|steal|stl|3-pt|three', re.I)
+MAPPED_STAT_RE = re.compile(r'point|pts|rebound|reb|assist|ast', re.I)
+STAT_KEYWORD_MAP = {
+    'point': 'PTS', 'pts': 'PTS',
+    'rebound': 'REB', 'reb': 'REB',
+    'assist': 'AST', 'ast': 'AST',
+}
+
+# Projection cards, and the divs inside them that may hold the stat/line text
+CARD_SELECTOR = (
+    "ul[aria-label='Projections List'] > li, "
+    "div#projections li, "
+    "li[id*='projection']"
+)
+CARD_TEXT_SELECTOR = (
+    "div[class*='text-'], "
+    "div[id*='test-'], "
+    "div[class*='stat'], "
+    "span[class*='name'], "
+    "div[class*='projection']"
+)
+CARDS_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0])).map((li, i) => ({
+    aria: li.getAttribute('aria-label'),
+    text: li.innerText,
+    divs: Array.from(li.querySelectorAll(arguments[1]))
+        .map(div => div.innerText.trim())
+        .filter(text => text),
+    html: i === 0 ? li.outerHTML : null
+}));
+"""
+
+def fetch_api_props(timeout=10):
+    """
+    Fetch NBA props straight from the PrizePicks projections API (no browser)
+    Returns the same prop tuples as scrape_props, or an empty list on failure
+    """
+    print(f"📡 Fetching projections from {PRIZEPICKS_API_URL}...")
+    
+    try:
+        response = requests.get(
+            PRIZEPICKS_API_URL,
+            params={'league_id': NBA_LEAGUE_ID, 'per_page': 1000, 'single_stat': 'true'},
+            headers={'User-Agent': USER_AGENT, 'Accept': 'application/json'},
+            timeout=timeout
+        )
+        response.raise_for_status()
+        data = response.json()
+    except Exception as e:
+        print(f"  ⚠️ API request failed: {e}")
+        return []
+    
+    # Player names live in the 'included' side-load, keyed by id
+    players = {
+        item['id']: item['attributes'].get('name')
+        for item in data.get('included', [])
+        if item.get('type') == 'new_player'
+    }
+    
+    props = []
+    timestamp = datetime.now().isoformat()
+    for projection in data.get('data', []):
+        attributes = projection.get('attributes', {})
+        
+        # Skip demon/goblin alternates and combo stats (e.g. "Pts+Rebs+Asts")
+        if attributes.get('odds_type', 'standard') != 'standard':
+            continue
+        stat_type = attributes.get('stat_type')
+        if not stat_type or '+' in stat_type:
+            continue
+        
+        stat_mapped = map_stat_type(stat_type)
+        player_ref = projection.get('relationships', {}).get('new_player', {}).get('data') or {}
+        player_name = players.get(player_ref.get('id'))
+        line_value = attributes.get('line_score')
+        
+        if player_name and stat_mapped and line_value:
+            props.append((player_name, stat_type, float(line_value), stat_mapped, 'PrizePicks', timestamp))
+    
+    print(f"  📊 Got {len(props)} PTS/REB/AST props from the API")
+    return props
 
 def setup_driver(headless=True):
     """Initialize undetected Chrome driver to bypass bot detection"""
     print("🔧 Setting up undetected Chrome driver...")
+    import undetected_chromedriver as uc  # Deferred: only needed for the browser fallback
     
     options = uc.ChromeOptions()
     
@@ -30,7 +123,7 @@ def setup_driver(headless=True):
     options.add_argument('--window-size=1920,1080')
     
     # Add a realistic user agent
-    options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    options.add_argument(f'--user-agent={USER_AGENT}')
     
     if headless:
         options.add_argument('--headless=new')  # Use new headless mode
@@ -159,13 +252,10 @@ def scrape_props(driver):
         scroll_slowly(driver)
         human_delay(2, 3)
         
-        # Find all projection items
+        # Serialize every projection card (aria-label, text, fallback div texts) in a
+        # single execute_script round-trip instead of several WebDriver calls per card
         # Based on screenshots: <li id="test-projection-li" aria-label="Player Name - Team">
-        projection_items = driver.find_elements(By.CSS_SELECTOR, 
-            "ul[aria-label='Projections List'] > li, "
-            "div#projections li, "
-            "li[id*='projection']"
-        )
+        projection_items = driver.execute_script(CARDS_SCRIPT, CARD_SELECTOR, CARD_TEXT_SELECTOR) or []
         
         print(f"  📊 Found {len(projection_items)} projection cards")
         
@@ -175,21 +265,21 @@ def scrape_props(driver):
             return create_demo_props()
         
         # DEBUG: Save first card's HTML to file
-        if len(projection_items) > 0:
+        if projection_items[0].get('html'):
             try:
-                debug_html = projection_items[0].get_attribute('outerHTML')
                 debug_path = '../data/debug_card.html'
                 with open(debug_path, 'w', encoding='utf-8') as f:
-                    f.write(debug_html)
+                    f.write(projection_items[0]['html'])
                 print(f"  🐛 Saved first card HTML to: {debug_path}")
             except:
                 pass
         
-        for idx, item in enumerate(projection_items):
+        timestamp = datetime.now().isoformat()
+        for item in projection_items:
             try:
                 # Get player name and team from aria-label
                 # Format: "Player Name - TEAM" (e.g., "Devin Vassell - SAS")
-                aria_label = item.get_attribute('aria-label')
+                aria_label = item.get('aria')
                 
                 if not aria_label:
                     continue
@@ -202,7 +292,7 @@ def scrape_props(driver):
                     continue
                 
                 # Get all text content from the card
-                full_text = item.text
+                full_text = item.get('text')
                 
                 if not full_text:
                     continue
@@ -220,9 +310,7 @@ def scrape_props(driver):
                         continue
                     
                     # Check if this is a stat type
-                    if not stat_type and any(keyword in line.lower() for keyword in 
-                        ['point', 'pts', 'rebound', 'reb', 'assist', 'ast', 
-                         'block', 'blk', 'steal', 'stl', '3-pt', 'three']):
+                    if not stat_type and STAT_KEYWORD_RE.search(line):
                         stat_type = line
                     
                     # Check if this is a numeric value (the line)
@@ -235,38 +323,21 @@ def scrape_props(driver):
                         except:
                             pass
                 
-                # Try alternative: look in specific div elements
+                # Try alternative: texts of specific div elements (collected by the script)
                 if not stat_type or not line_value:
-                    try:
-                        # Look for divs with test IDs or specific classes
-                        text_divs = item.find_elements(By.CSS_SELECTOR, 
-                            "div[class*='text-'], "
-                            "div[id*='test-'], "
-                            "div[class*='stat'], "
-                            "span[class*='name'], "
-                            "div[class*='projection']"
-                        )
+                    for text in item.get('divs') or []:
+                        # Check for stat type
+                        if not stat_type and MAPPED_STAT_RE.search(text):
+                            stat_type = text
                         
-                        for div in text_divs:
-                            text = div.text.strip()
-                            if not text:
-                                continue
-                            
-                            # Check for stat type
-                            if not stat_type and any(keyword in text.lower() for keyword in 
-                                ['point', 'pts', 'rebound', 'reb', 'assist', 'ast']):
-                                stat_type = text
-                            
-                            # Check for line value
-                            if not line_value:
-                                try:
-                                    val = float(text.replace(',', ''))
-                                    if 0 < val < 100:
-                                        line_value = val
-                                except:
-                                    pass
-                    except:
-                        pass
+                        # Check for line value
+                        if not line_value:
+                            try:
+                                val = float(text.replace(',', ''))
+                                if 0 < val < 100:
+                                    line_value = val
+                            except:
+                                pass
                 
                 # Map stat type to our format (PTS, REB, AST)
                 if stat_type:
@@ -276,14 +347,7 @@ def scrape_props(driver):
                 
                 # Only add if we have all required data and it's a stat we care about
                 if player_name and stat_type and line_value and stat_mapped:
-                    props.append({
-                        'player': player_name,
-                        'stat': stat_type,
-                        'line': line_value,
-                        'stat_mapped': stat_mapped,
-                        'source': 'PrizePicks',
-                        'timestamp': datetime.now().isoformat()
-                    })
+                    props.append((player_name, stat_type, line_value, stat_mapped, 'PrizePicks', timestamp))
                     print(f"  ✓ {player_name} - {stat_type}: {line_value}")
                 
             except Exception as e:
@@ -305,16 +369,13 @@ def scrape_props(driver):
 
 def map_stat_type(stat_str):
     """Map PrizePicks stat names to our format"""
-    stat_lower = stat_str.lower()
+    found = {STAT_KEYWORD_MAP[match.lower()] for match in MAPPED_STAT_RE.findall(stat_str)}
     
-    if 'point' in stat_lower or 'pts' in stat_lower:
-        return 'PTS'
-    elif 'rebound' in stat_lower or 'reb' in stat_lower:
-        return 'REB'
-    elif 'assist' in stat_lower or 'ast' in stat_lower:
-        return 'AST'
-    else:
-        return None  # We only predict PTS, REB, AST
+    # Points take priority over rebounds over assists (e.g. combo stat names)
+    for stat in ('PTS', 'REB', 'AST'):
+        if stat in found:
+            return stat
+    return None  # We only predict PTS, REB, AST
 
 def create_demo_props():
     """Create demo props for testing when scraper fails"""
@@ -339,25 +400,14 @@ def create_demo_props():
         ('Chris Paul', 'Assists', 8.5, 'AST'),
     ]
     
-    props = []
-    for player, stat, line, stat_mapped in demo_players:
-        props.append({
-            'player': player,
-            'stat': stat,
-            'line': line,
-            'stat_mapped': stat_mapped,
-            'source': 'Demo',
-            'timestamp': datetime.now().isoformat()
-        })
-    
-    return props
+    timestamp = datetime.now().isoformat()
+    return [
+        (player, stat, line, stat_mapped, 'Demo', timestamp)
+        for player, stat, line, stat_mapped in demo_players
+    ]
 
-def scrape_prizepicks(headless=True):
-    """Main scraping function"""
-    print("\n" + "="*60)
-    print("🎯 PRIZEPICKS SCRAPER")
-    print("="*60)
-    
+def scrape_with_browser(headless=True):
+    """Scrape props by rendering the PrizePicks board in Chrome (slow fallback)"""
     driver = None
     
     try:
@@ -388,11 +438,30 @@ def scrape_prizepicks(headless=True):
         select_nba_board(driver)
         
         # Scrape props
-        props = scrape_props(driver)
+        return scrape_props(driver)
+        
+    finally:
+        if driver:
+            driver.quit()
+            print("\n🔒 Browser closed")
+
+def scrape_prizepicks(headless=True, use_api=True):
+    """Main scraping function"""
+    print("\n" + "="*60)
+    print("🎯 PRIZEPICKS SCRAPER")
+    print("="*60)
+    
+    try:
+        # The JSON API returns the whole board in one request; only render the
+        # site in a browser if it fails
+        props = fetch_api_props() if use_api else []
+        if not props:
+            props = scrape_with_browser(headless=headless)
         
         # Convert to DataFrame
         if props:
-            df = pd.DataFrame(props)
+            df = pd.DataFrame.from_records(props, columns=PROP_COLUMNS)
+            df['line'] = df['line'].astype(np.float32)
             
             # Save to CSV
             df.to_csv(OUTPUT_PATH, index=False)
@@ -416,17 +485,13 @@ def scrape_prizepicks(headless=True):
         import traceback
         traceback.print_exc()
         return None
-        
-    finally:
-        if driver:
-            driver.quit()
-            print("\n🔒 Browser closed")
 
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description='Scrape PrizePicks NBA props')
     parser.add_argument('--visible', action='store_true', help='Run browser in visible mode (for debugging)')
+    parser.add_argument('--browser', action='store_true', help='Skip the JSON API and scrape with Chrome')
     args = parser.parse_args()
     
-    scrape_prizepicks(headless=not args.visible)
\ No newline at end of file
+    scrape_prizepicks(headless=not args.visible, use_api=not args.browser)
\ No newline at end of file
@@ -1,10 +1,42 @@
+import os
+import re
 import pandas as pd
 import numpy as np
+import xgboost as xgb
 from nba_api.stats.static import players
-from nba_api.stats.endpoints import playergamelog
+from gamelog_cache import fetch_gamelog, configure_http_session
+from features import latest_model_path, POINTS_FEATURES, REBOUNDS_FEATURES, ASSISTS_FEATURES
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import time
 
+# Active player list is static nba_api data: load it once and index it by lowercase name
+_PLAYERS = players.get_active_players()
+_NAMES_LOWER = [(p['full_name'].lower(), p['id']) for p in _PLAYERS]
+# Reversed so the first player wins on duplicate names, like the old linear scan
+_NAME_TO_ID = dict(reversed(_NAMES_LOWER))
+
+# "LAL vs. BOS" / "LAL @ BOS" -> "BOS"
+OPPONENT_RE = re.compile(r'(?:vs\.|@)\s*(\w+)')
+
+# Box-score columns summarized by calculate_realtime_features
+STAT_COLUMNS = ['PTS', 'REB', 'AST', 'MIN', 'FGA', 'FTA', 'FG_PCT', 'FG3_PCT', 'FG3M', 'PLUS_MINUS']
+# Positions of the PTS/REB/AST columns averaged for the matchup history
+VS_OPP_COLUMNS = [STAT_COLUMNS.index(c) for c in ('PTS', 'REB', 'AST')]
+
+# Every model input once, plus each model's positions in that full vector
+ALL_FEATURES = tuple(dict.fromkeys(POINTS_FEATURES + REBOUNDS_FEATURES + ASSISTS_FEATURES))
+PTS_COL_IDX = np.array([ALL_FEATURES.index(k) for k in POINTS_FEATURES])
+REB_COL_IDX = np.array([ALL_FEATURES.index(k) for k in REBOUNDS_FEATURES])
+AST_COL_IDX = np.array([ALL_FEATURES.index(k) for k in ASSISTS_FEATURES])
+
+# Trained models, loaded once per process by _load_models
+MODELS_DIR = '../models/current/'
+_MODELS = {}
+
+# Concurrent game log fetches when predicting a whole slate (kept small for the NBA API)
+FETCH_WORKERS = 4
+
 def get_current_season():
     """Determine current NBA season based on today's date"""
     today = datetime.now()
@@ -21,18 +53,17 @@ def get_current_season():
 
 def find_player_id(player_name):
     """Get NBA API player ID from name"""
-    all_players = players.get_active_players()
+    name = player_name.lower()
     
-    for player in all_players:
-        if player['full_name'].lower() == player_name.lower():
-            return player['id']
-    
-    # Try partial match
-    for player in all_players:
-        if player_name.lower() in player['full_name'].lower():
-            return player['id']
-    
-    return None
+    # Exact match is a dict hit; fall back to a partial match scan
+    player_id = _NAME_TO_ID.get(name)
+    if player_id is not None:
+        return player_id
+    return next((pid for full_name, pid in _NAMES_LOWER if name in full_name), None)
+
+def parse_opponents(matchups):
+    """Opponent of each matchup ("LAL vs. BOS" / "LAL @ BOS" -> "BOS"), one vectorized regex pass"""
+    return matchups.str.extract(OPPONENT_RE, expand=False).fillna('UNK')
 
 def fetch_recent_games(player_name, season=None, num_games=15):
     """Fetch player's most recent games from NBA API"""
@@ -46,49 +77,49 @@ def fetch_recent_games(player_name, season=None, num_games=15):
         return None
     
     try:
-        # Fetch game log
-        gamelog = playergamelog.PlayerGameLog(
-            player_id=player_id,
-            season=season,
-            timeout=30
-        )
-        
-        df = gamelog.get_data_frames()[0]
+        # Fetch game log (disk-cached for a few hours)
+        df = fetch_gamelog(player_id, season, timeout=30)
         
         if df.empty:
             return None
         
-        # Convert date first
-        df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
-        
-        # Filter out future games (games that haven't been played yet)
-        # NBA API includes scheduled games with no WL value
-        df = df[df['WL'].notna()]
-        
-        # Also filter out any games after today (safety check)
-        from datetime import datetime
-        today = pd.Timestamp(datetime.now())
-        df = df[df['GAME_DATE'] <= today]
+        # Filter out future games in one mask: the NBA API includes scheduled games
+        # with no WL value, plus a safety check for any game after today
+        dates = pd.to_datetime(df['GAME_DATE']).to_numpy()
+        played = df['WL'].notna().to_numpy() & (dates <= np.datetime64(datetime.now()))
         
-        # Sort by date (most recent first) BEFORE taking head
-        df = df.sort_values('GAME_DATE', ascending=False)
+        # Most recent first, then take the newest num_games
+        positions = np.flatnonzero(played)
+        newest = positions[np.argsort(dates[positions], kind='stable')[::-1][:num_games]]
+        recent = df.iloc[newest]
         
-        # NOW take most recent games
-        df = df.head(num_games)
-        
-        return df
+        return recent.assign(GAME_DATE=dates[newest], OPPONENT=parse_opponents(recent['MATCHUP']))
         
     except Exception as e:
         print(f"Error fetching data: {e}")
         return None
 
-def extract_opponent(matchup):
-    """Extract opponent from matchup string"""
-    if 'vs.' in matchup:
-        return matchup.split(' vs. ')[1]
-    elif ' @ ' in matchup:
-        return matchup.split(' @ ')[1]
-    return 'UNK'
+def window_stats(stats):
+    """
+    L5 mean, L10 mean, season mean and L10 sample std of every column in one kernel
+    
+    stats is oldest-to-newest; NaNs are skipped like pandas. A single NaN mask and
+    zero-filled copy are shared by all reductions, and the std is two-pass
+    (deviations from the L10 mean) for stability.
+    """
+    valid = ~np.isnan(stats)
+    filled = np.where(valid, stats, 0.0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):  # Empty windows -> NaN, like pandas
+        counts = valid[-10:].sum(axis=0)
+        l10 = filled[-10:].sum(axis=0) / counts
+        l5 = filled[-5:].sum(axis=0) / valid[-5:].sum(axis=0)
+        season = filled.sum(axis=0) / valid.sum(axis=0)
+        
+        deviations = np.where(valid[-10:], filled[-10:] - l10, 0.0)
+        l10_std = np.sqrt((deviations * deviations).sum(axis=0) / (counts - 1))
+    
+    return l5, l10, season, l10_std
 
 def calculate_realtime_features(recent_games_df, opponent, is_home, rest_days):
     """
@@ -106,39 +137,51 @@ def calculate_realtime_features(recent_games_df, opponent, is_home, rest_days):
     if recent_games_df is None or len(recent_games_df) < 5:
         return None
     
-    # Add opponent column
-    recent_games_df['OPPONENT'] = recent_games_df['MATCHUP'].apply(extract_opponent)
+    # Work on plain arrays in oldest-to-newest order: no sorted DataFrame copy, and
+    # the caller's frame is left untouched
+    order = np.argsort(recent_games_df['GAME_DATE'].to_numpy(), kind='stable')
+    if 'OPPONENT' in recent_games_df:
+        opponents = recent_games_df['OPPONENT'].to_numpy()[order]
+    else:
+        opponents = parse_opponents(recent_games_df['MATCHUP']).to_numpy()[order]
+    if 'WL_W' in recent_games_df:
+        wins = recent_games_df['WL_W'].to_numpy()[order]
+    else:
+        wins = (recent_games_df['WL'].to_numpy() == 'W')[order]
     
-    # Reverse to calculate rolling stats correctly (oldest to newest)
-    df = recent_games_df.sort_values('GAME_DATE', ascending=True)
+    # One contiguous matrix of the box-score columns; every L5/L10/season stat
+    # is a single column-wise reduction over a row slice
+    stats = recent_games_df[STAT_COLUMNS].to_numpy(dtype=np.float64)[order]
+    l5, l10, season, l10_std = window_stats(stats)
+    stat = dict(zip(STAT_COLUMNS, range(len(STAT_COLUMNS))))
     
     # Calculate features
     features = {}
     
     # === POINTS FEATURES ===
-    features['L5_PTS'] = df['PTS'].tail(5).mean()
-    features['L10_PTS'] = df['PTS'].tail(10).mean() if len(df) >= 10 else df['PTS'].mean()
-    features['SEASON_AVG_PTS'] = df['PTS'].mean()
-    features['L10_PTS_STD'] = df['PTS'].tail(10).std() if len(df) >= 10 else df['PTS'].std()
+    features['L5_PTS'] = l5[stat['PTS']]
+    features['L10_PTS'] = l10[stat['PTS']]
+    features['SEASON_AVG_PTS'] = season[stat['PTS']]
+    features['L10_PTS_STD'] = l10_std[stat['PTS']]
     features['RECENT_TREND_PTS'] = features['L5_PTS'] - features['L10_PTS']
     
     # === REBOUNDS FEATURES ===
-    features['L5_REB'] = df['REB'].tail(5).mean()
-    features['L10_REB'] = df['REB'].tail(10).mean() if len(df) >= 10 else df['REB'].mean()
-    features['L10_REB_STD'] = df['REB'].tail(10).std() if len(df) >= 10 else df['REB'].std()
+    features['L5_REB'] = l5[stat['REB']]
+    features['L10_REB'] = l10[stat['REB']]
+    features['L10_REB_STD'] = l10_std[stat['REB']]
     features['RECENT_TREND_REB'] = features['L5_REB'] - features['L10_REB']
     
     # === ASSISTS FEATURES ===
-    features['L5_AST'] = df['AST'].tail(5).mean()
-    features['L10_AST'] = df['AST'].tail(10).mean() if len(df) >= 10 else df['AST'].mean()
-    features['L10_AST_STD'] = df['AST'].tail(10).std() if len(df) >= 10 else df['AST'].std()
+    features['L5_AST'] = l5[stat['AST']]
+    features['L10_AST'] = l10[stat['AST']]
+    features['L10_AST_STD'] = l10_std[stat['AST']]
     features['RECENT_TREND_AST'] = features['L5_AST'] - features['L10_AST']
     
     # === MINUTES & USAGE ===
-    features['L5_MIN'] = df['MIN'].tail(5).mean()
-    features['L10_MIN'] = df['MIN'].tail(10).mean() if len(df) >= 10 else df['MIN'].mean()
-    features['L5_FGA'] = df['FGA'].tail(5).mean()
-    features['L5_FTA'] = df['FTA'].tail(5).mean()
+    features['L5_MIN'] = l5[stat['MIN']]
+    features['L10_MIN'] = l10[stat['MIN']]
+    features['L5_FGA'] = l5[stat['FGA']]
+    features['L5_FTA'] = l5[stat['FTA']]
     
     features['USAGE_RATE'] = features['L5_FGA'] / (features['L5_MIN'] + 0.1)
     features['FT_RATE'] = features['L5_FTA'] / (features['L5_MIN'] + 0.1)
@@ -146,9 +189,9 @@ def calculate_realtime_features(recent_games_df, opponent, is_home, rest_days):
     features['PPM_L10'] = features['L10_PTS'] / (features['L10_MIN'] + 0.1)
     
     # === SHOOTING ===
-    features['L5_FG_PCT'] = df['FG_PCT'].tail(5).mean()
-    features['L5_FG3_PCT'] = df['FG3_PCT'].tail(5).mean()
-    features['L5_FG3M'] = df['FG3M'].tail(5).mean()
+    features['L5_FG_PCT'] = l5[stat['FG_PCT']]
+    features['L5_FG3_PCT'] = l5[stat['FG3_PCT']]
+    features['L5_FG3M'] = l5[stat['FG3M']]
     
     # === GAME CONTEXT ===
     features['IS_HOME'] = is_home
@@ -157,11 +200,14 @@ def calculate_realtime_features(recent_games_df, opponent, is_home, rest_days):
     features['IS_RESTED'] = 1 if rest_days >= 2 else 0
     
     # === MATCHUP HISTORY vs OPPONENT ===
-    opp_games = df[df['OPPONENT'] == opponent]
-    if len(opp_games) > 0:
-        features['VS_OPP_AVG_PTS'] = opp_games['PTS'].mean()
-        features['VS_OPP_AVG_REB'] = opp_games['REB'].mean()
-        features['VS_OPP_AVG_AST'] = opp_games['AST'].mean()
+    vs_opp = np.flatnonzero(opponents == opponent)
+    if len(vs_opp):
+        # Only the three matchup columns are reduced, gathered in one fancy index
+        opp_stats = stats[np.ix_(vs_opp, VS_OPP_COLUMNS)]
+        opp_valid = ~np.isnan(opp_stats)
+        with np.errstate(divide='ignore', invalid='ignore'):  # All-NaN column -> NaN
+            opp_avg = np.where(opp_valid, opp_stats, 0.0).sum(axis=0) / opp_valid.sum(axis=0)
+        features['VS_OPP_AVG_PTS'], features['VS_OPP_AVG_REB'], features['VS_OPP_AVG_AST'] = opp_avg
     else:
         # Use overall averages if no history
         features['VS_OPP_AVG_PTS'] = features['SEASON_AVG_PTS']
@@ -175,21 +221,41 @@ def calculate_realtime_features(recent_games_df, opponent, is_home, rest_days):
     features['OPP_DEF_STRENGTH_AST'] = 3.5   # League avg ~3.5 ast per player
     
     # === PACE METRICS ===
-    features['OPP_PACE'] = df['FGA'].tail(10).mean() if len(df) >= 10 else df['FGA'].mean()
-    features['TEAM_PACE'] = df['FGA'].tail(10).mean() if len(df) >= 10 else df['FGA'].mean()
+    features['OPP_PACE'] = l10[stat['FGA']]
+    features['TEAM_PACE'] = l10[stat['FGA']]
     
     # === ADVANCED ===
-    features['L5_WIN_PCT'] = (df['WL'].tail(5) == 'W').mean()
-    features['L5_PLUS_MINUS'] = df['PLUS_MINUS'].tail(5).mean()
+    features['L5_WIN_PCT'] = wins[-5:].mean()
+    features['L5_PLUS_MINUS'] = l5[stat['PLUS_MINUS']]
     
     return features
 
+def prediction_features(recent_games, opponent, is_home, rest_days):
+    """
+    Per-model float32 feature vectors from already fetched recent games
+    
+    Returns:
+        Tuple of (pts_features, reb_features, ast_features) in the order of
+        POINTS_FEATURES / REBOUNDS_FEATURES / ASSISTS_FEATURES, or Nones if there is
+        too little data
+    """
+    features = calculate_realtime_features(recent_games, opponent, is_home, rest_days)
+    
+    if features is None:
+        return None, None, None
+    
+    # One float32 vector of every input, sliced positionally for each model
+    full_vec = np.array([features[k] for k in ALL_FEATURES], dtype=np.float32)
+    
+    return full_vec[PTS_COL_IDX], full_vec[REB_COL_IDX], full_vec[AST_COL_IDX]
+
 def get_realtime_prediction_features(player_name, opponent, is_home, rest_days, season=None):
     """
     Main function to get real-time features for prediction
     
     Returns:
-        Tuple of (pts_features_dict, reb_features_dict, ast_features_dict, recent_games_df)
+        Tuple of (pts_features, reb_features, ast_features, recent_games_df); each feature
+        array is float32 in the order of POINTS_FEATURES / REBOUNDS_FEATURES / ASSISTS_FEATURES
     """
     # Fetch recent games
     recent_games = fetch_recent_games(player_name, season=season, num_games=15)
@@ -197,59 +263,37 @@ def get_realtime_prediction_features(player_name, opponent, is_home, rest_days,
     if recent_games is None:
         return None, None, None, None
     
-    # Calculate features
-    features = calculate_realtime_features(recent_games, opponent, is_home, rest_days)
+    pts_features, reb_features, ast_features = prediction_features(recent_games, opponent, is_home, rest_days)
     
-    if features is None:
+    if pts_features is None:
         return None, None, None, None
     
-    # Separate features for each model
-    pts_features = {k: features[k] for k in [
-        'L5_PTS', 'L10_PTS', 'SEASON_AVG_PTS', 'L10_PTS_STD', 'RECENT_TREND_PTS',
-        'IS_HOME', 'REST_DAYS', 'IS_BACK_TO_BACK', 'IS_RESTED',
-        'L5_MIN', 'L10_MIN', 'USAGE_RATE', 'FT_RATE', 'PPM_L5', 'PPM_L10',
-        'L5_FG_PCT', 'L5_FG3_PCT', 'L5_FG3M',
-        'L5_REB', 'L5_AST',
-        'VS_OPP_AVG_PTS', 'OPP_DEF_STRENGTH_PTS', 'OPP_PACE', 'TEAM_PACE',
-        'L5_WIN_PCT', 'L5_PLUS_MINUS'
-    ]}
-    
-    reb_features = {k: features[k] for k in [
-        'L5_REB', 'L10_REB', 'L10_REB_STD', 'RECENT_TREND_REB',
-        'IS_HOME', 'REST_DAYS', 'IS_BACK_TO_BACK', 'IS_RESTED',
-        'L5_MIN', 'L10_MIN', 'USAGE_RATE',
-        'L5_PTS', 'L5_AST',
-        'VS_OPP_AVG_REB', 'OPP_DEF_STRENGTH_REB', 'OPP_PACE', 'TEAM_PACE',
-        'L5_WIN_PCT', 'L5_PLUS_MINUS'
-    ]}
-    
-    ast_features = {k: features[k] for k in [
-        'L5_AST', 'L10_AST', 'L10_AST_STD', 'RECENT_TREND_AST',
-        'IS_HOME', 'REST_DAYS', 'IS_BACK_TO_BACK', 'IS_RESTED',
-        'L5_MIN', 'L10_MIN', 'USAGE_RATE',
-        'L5_PTS', 'L5_REB',
-        'VS_OPP_AVG_AST', 'OPP_DEF_STRENGTH_AST', 'OPP_PACE', 'TEAM_PACE',
-        'L5_WIN_PCT', 'L5_PLUS_MINUS'
-    ]}
-    
     return pts_features, reb_features, ast_features, recent_games
 
+def _load_models():
+    """Load the PTS/REB/AST models into the module cache on first use and return it"""
+    if not _MODELS:
+        for stat_type in ['pts', 'reb', 'ast']:
+            model_path = latest_model_path(MODELS_DIR, stat_type)
+            if os.path.exists(model_path):
+                model = xgb.XGBRegressor()
+                model.load_model(model_path)
+                _MODELS[stat_type.upper()] = model
+                print(f"  ✓ Loaded {stat_type.upper()} model")
+            else:
+                print(f"  ⚠️ Missing {stat_type.upper()} model: {model_path}")
+    return _MODELS
+
 def run_realtime_prediction():
     """
     Load today's props from CSV, generate predictions, and save results
     """
-    import pandas as pd
-    import xgboost as xgb
-    import os
-    from datetime import datetime
-    
     print("\n" + "="*60)
     print("🔮 GENERATING PREDICTIONS")
     print("="*60)
     
     # Paths
     TODAYS_PROPS = '../data/predictions/todays_props.csv'
-    MODELS_DIR = '../models/current/'
     OUTPUT_PATH = '../data/predictions/analysis_results.csv'
     
     # Check if props file exists
@@ -262,25 +306,27 @@ def run_realtime_prediction():
     props_df = pd.read_csv(TODAYS_PROPS)
     print(f"  Found {len(props_df)} props")
     
-    # Load models
+    # Load models (cached after the first call)
     print(f"\n🤖 Loading models from: {MODELS_DIR}")
-    models = {}
-    for stat_type in ['pts', 'reb', 'ast']:
-        model_path = os.path.join(MODELS_DIR, f"{stat_type}_model.json")
-        if os.path.exists(model_path):
-            model = xgb.XGBRegressor()
-            model.load_model(model_path)
-            models[stat_type.upper()] = model
-            print(f"  ✓ Loaded {stat_type.upper()} model")
-        else:
-            print(f"  ⚠️ Missing {stat_type.upper()} model: {model_path}")
+    models = _load_models()
     
     if not models:
         print("❌ No models found!")
         return False
     
-    # Generate predictions
+    # I/O phase: fetch every player's recent games concurrently, once per player
+    # (the feature/predict loop below then never blocks on the network)
+    players_to_fetch = props_df.loc[props_df['stat_mapped'].isin(list(models)), 'player'].unique()
+    print(f"\n📡 Fetching recent games for {len(players_to_fetch)} players...")
+    configure_http_session(pool_size=FETCH_WORKERS)
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        recent_by_player = dict(zip(players_to_fetch, executor.map(fetch_recent_games, players_to_fetch)))
+    
+    # CPU phase: build feature rows for every prop first, then predict each stat in
+    # one batch (one predict call per model instead of one per prop)
     results = []
+    batch_rows = {stat: [] for stat in models}
+    batch_results = {stat: [] for stat in models}
     print(f"\n🔍 Generating predictions...")
     
     for idx, row in props_df.iterrows():
@@ -298,23 +344,16 @@ def run_realtime_prediction():
         # For now, use dummy features (opponent="N/A", home=True, rest_days=1)
         # In production, you'd fetch actual game info
         try:
-            pts_features, reb_features, ast_features, recent_games = get_realtime_prediction_features(
-                player, 
+            recent_games = recent_by_player.get(player)
+            pts_features, reb_features, ast_features = prediction_features(
+                recent_games,
                 opponent="N/A",  # TODO: Get actual opponent
                 is_home=True,     # TODO: Get actual home/away
                 rest_days=1       # TODO: Get actual rest days
             )
             
-            if stat_type == 'PTS' and pts_features:
-                features_df = pd.DataFrame([pts_features])
-                prediction = models['PTS'].predict(features_df)[0]
-            elif stat_type == 'REB' and reb_features:
-                features_df = pd.DataFrame([reb_features])
-                prediction = models['REB'].predict(features_df)[0]
-            elif stat_type == 'AST' and ast_features:
-                features_df = pd.DataFrame([ast_features])
-                prediction = models['AST'].predict(features_df)[0]
-            else:
+            stat_features = {'PTS': pts_features, 'REB': reb_features, 'AST': ast_features}.get(stat_type)
+            if stat_features is None:
                 print(f"    ⚠️ Could not generate features")
                 continue
             
@@ -322,22 +361,43 @@ def run_realtime_prediction():
             l5_avg = recent_games.tail(5)[stat_type].mean() if recent_games is not None and len(recent_games) > 0 else 0
             last_game_date = recent_games.iloc[0]['GAME_DATE'] if recent_games is not None and len(recent_games) > 0 else None
             
-            print(f"    ✓ Prediction: {prediction:.1f} (L5 Avg: {l5_avg:.1f})")
-            
-            results.append({
+            result = {
                 'player': player,
                 'stat': row['stat'],
                 'line': line,
-                'prediction': prediction,
+                'prediction': None,
                 'l5_avg': l5_avg,
                 'last_game': last_game_date,
-                'edge': prediction - line
-            })
+                'edge': None
+            }
+            results.append(result)
+            batch_rows[stat_type].append(stat_features)
+            batch_results[stat_type].append(result)
             
         except Exception as e:
             print(f"    ❌ Error: {e}")
             continue
     
+    for stat_type, rows in batch_rows.items():
+        if not rows:
+            continue
+        try:
+            # Stack the float32 rows (already in training column order) straight into
+            # the booster (no DataFrame -> DMatrix conversion or column-name validation)
+            predictions = models[stat_type].get_booster().inplace_predict(np.vstack(rows))
+        except Exception as e:
+            print(f"\n  ❌ {stat_type} batch prediction failed: {e}")
+            continue
+        
+        print(f"\n  ✓ {stat_type}: {len(rows)} predictions")
+        for result, prediction in zip(batch_results[stat_type], predictions):
+            result['prediction'] = prediction
+            result['edge'] = prediction - result['line']
+            print(f"    {result['player']}: {prediction:.1f} (L5 Avg: {result['l5_avg']:.1f})")
+    
+    # Drop props whose batch failed (still in original prop order)
+    results = [r for r in results if r['prediction'] is not None]
+    
     # Save results
     if results:
         results_df = pd.DataFrame(results)
@@ -1,26 +1,59 @@
 import pandas as pd
+import os
 import time
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 from nba_api.stats.static import players
-from nba_api.stats.endpoints import playergamelog
+from gamelog_cache import fetch_gamelog, configure_http_session
 from requests.exceptions import ReadTimeout, ConnectionError
 
 # --- CONFIG ---
 SEASONS = ['2023-24', '2024-25'] 
-OUTPUT_PATH = '../data/raw/nba_logs.csv'
+OUTPUT_DIR = '../data/raw/nba_logs/'  # Parquet dataset, one part file per scrape run
+
+# Only the columns feature engineering uses, downcast before they pile up in memory
+KEEP_COLUMNS = [
+    'Player_ID', 'PLAYER_NAME', 'SEASON_ID', 'GAME_DATE', 'MATCHUP', 'WL', 'WL_W',
+    'MIN', 'PTS', 'REB', 'AST', 'FGA', 'FTA', 'FG_PCT', 'FG3_PCT', 'FG3M', 'PLUS_MINUS'
+]
+LOG_DTYPES = {
+    'Player_ID': 'int32',
+    'WL_W': 'uint8',
+    # Nullable Int16: a missing stat (e.g. a DNP row) stays NA instead of failing the cast
+    **{col: 'Int16' for col in ['PTS', 'REB', 'AST', 'FGA', 'FTA', 'FG3M']},
+    **{col: 'float32' for col in ['MIN', 'FG_PCT', 'FG3_PCT', 'PLUS_MINUS']},
+}
+
+# Requests run in parallel, but the aggregate rate stays under the NBA API limit.
+# The default matches the old sequential scraper (~1-1.5 req/s across all threads);
+# raise it deliberately with --max-requests-per-second
+MAX_WORKERS = 8
+MAX_REQUESTS_PER_SECOND = 1.25
+
+_rate_lock = threading.Lock()
+_next_request_at = 0.0
+
+def wait_for_rate_limit():
+    """Block until this thread may send a request (shared across all worker threads)"""
+    global _next_request_at
+    with _rate_lock:
+        now = time.monotonic()
+        # Small jitter so requests don't land on an exact beat
+        interval = 1.0 / MAX_REQUESTS_PER_SECOND * random.uniform(1.0, 1.25)
+        wait_time = max(0.0, _next_request_at - now)
+        _next_request_at = max(now, _next_request_at) + interval
+    if wait_time:
+        time.sleep(wait_time)
 
 # Custom function to handle "flaky" API calls
 def fetch_with_retry(player_id, season, retries=3):
     for attempt in range(retries):
         try:
             # timeout=60 tells the API to wait 60 seconds before giving up (default is 30)
-            gamelog = playergamelog.PlayerGameLog(
-                player_id=player_id, 
-                season=season,
-                timeout=60
-            )
-            return gamelog.get_data_frames()[0]
+            # Cached logs come straight from disk; only real requests wait on the rate limit
+            return fetch_gamelog(player_id, season, timeout=60, before_request=wait_for_rate_limit)
         
         except (ReadTimeout, ConnectionError) as e:
             # If it fails, wait longer each time (2s, 4s, 8s...)
@@ -35,37 +68,77 @@ def fetch_with_retry(player_id, season, retries=3):
             
     return pd.DataFrame() # Return empty if all retries failed
 
-def fetch_data():
-    print("Fetching active player list...")
-    nba_players = players.get_active_players()
-    print(f"Found {len(nba_players)} active players.")
-    
-    all_logs = []
-    
-    # tqdm creates the progress bar
-    for player in tqdm(nba_players[:300]):
-        player_name = player['full_name']
-        player_id = player['id']
+def fetch_jobs(jobs):
+    """
+    Fetch (player_name, player_id, season) jobs on a bounded thread pool
+    Returns {job index: tagged game log DataFrame} for the jobs that returned data
+    """
+    results = {}
+    configure_http_session(pool_size=MAX_WORKERS)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(fetch_with_retry, player_id, season): (i, player_name, season)
+            for i, (player_name, player_id, season) in enumerate(jobs)
+        }
         
-        for season in SEASONS:
-            # Call our new "Robust" function
-            df = fetch_with_retry(player_id, season)
+        # tqdm creates the progress bar
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            i, player_name, season = futures[future]
+            df = future.result()
             
             if not df.empty:
                 df['PLAYER_NAME'] = player_name
                 df['SEASON_ID'] = season
-                all_logs.append(df)
-            
-            # Random sleep 0.6 to 1.0 seconds to look more human
-            time.sleep(random.uniform(0.6, 1.0))
+                results[i] = df[KEEP_COLUMNS].astype(LOG_DTYPES)
+    
+    return results
+
+def save_logs(logs_df, append=False):
+    """
+    Write scraped logs as a zstd parquet part in OUTPUT_DIR
+    append=False replaces the existing parts; append=True adds a new part next to them
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    existing_parts = sorted(f for f in os.listdir(OUTPUT_DIR) if f.endswith('.parquet'))
+    
+    if not append:
+        for part in existing_parts:
+            os.remove(os.path.join(OUTPUT_DIR, part))
+        existing_parts = []
+    
+    part_path = os.path.join(OUTPUT_DIR, f"part-{len(existing_parts):04d}.parquet")
+    logs_df.to_parquet(part_path, engine='pyarrow', compression='zstd', index=False)
+    return part_path
+
+def fetch_data():
+    print("Fetching active player list...")
+    nba_players = players.get_active_players()
+    print(f"Found {len(nba_players)} active players.")
+    
+    # One job per (player, season); results are kept in job order for a stable CSV
+    jobs = [
+        (player['full_name'], player['id'], season)
+        for player in nba_players[:300]
+        for season in SEASONS
+    ]
+    results = fetch_jobs(jobs)
+    all_logs = [results[i] for i in sorted(results)]
     
     # Save
     if all_logs:
         master_df = pd.concat(all_logs, ignore_index=True)
-        master_df.to_csv(OUTPUT_PATH, index=False)
-        print(f"\n✅ SUCCESS: Scraped {len(master_df)} rows. Saved to {OUTPUT_PATH}")
+        part_path = save_logs(master_df)
+        print(f"\n✅ SUCCESS: Scraped {len(master_df)} rows. Saved to {part_path}")
     else:
         print("\n❌ FAILED: No data found.")
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Scrape NBA player game logs')
+    parser.add_argument('--max-requests-per-second', type=float, default=MAX_REQUESTS_PER_SECOND,
+                        help='Aggregate NBA API request rate across all worker threads')
+    args = parser.parse_args()
+    
+    MAX_REQUESTS_PER_SECOND = args.max_requests_per_second
     fetch_data()
\ No newline at end of file
@@ -1,14 +1,17 @@
 import pandas as pd
 import xgboost as xgb
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.model_selection import TimeSeriesSplit
+from sklearn.metrics import mean_absolute_error
+from joblib import Parallel, delayed
 import numpy as np
 import json
+import shutil
+import warnings
+from functools import lru_cache
 from datetime import datetime
 import os
+from features import latest_training_data_path, POINTS_FEATURES, REBOUNDS_FEATURES, ASSISTS_FEATURES
 
 # ==================== CONFIGURATION ====================
-DATA_PATH = "../data/processed/training_data.csv"
 MODELS_DIR = "../models/"
 CURRENT_MODELS_DIR = "../models/current/"
 RESULTS_DIR = "../results/"
@@ -21,73 +24,44 @@ os.makedirs(RESULTS_DIR, exist_ok=True)
 # Training configuration
 TRAIN_SPLIT = 0.8
 RANDOM_STATE = 42
+TRAIN_EVAL_SAMPLES = 10_000  # Training-set metrics are diagnostics; estimate them on a sample
+CV_WARM_START_ESTIMATORS = 200  # Extra trees per CV fold after the first (folds warm-start)
+EARLY_STOPPING_ROUNDS = 50  # Stop a CV fit once validation MAE/RMSE stalls this many rounds
 
-# Feature sets for different targets
-POINTS_FEATURES = [
-    # Core points stats
-    'L5_PTS', 'L10_PTS', 'SEASON_AVG_PTS', 'L10_PTS_STD', 'RECENT_TREND_PTS',
-    
-    # Context
-    'IS_HOME', 'REST_DAYS', 'IS_BACK_TO_BACK', 'IS_RESTED',
-    
-    # Minutes & Usage
-    'L5_MIN', 'L10_MIN', 'USAGE_RATE', 'FT_RATE', 'PPM_L5', 'PPM_L10',
-    
-    # Shooting
-    'L5_FG_PCT', 'L5_FG3_PCT', 'L5_FG3M',
-    
-    # Supporting stats
-    'L5_REB', 'L5_AST',
-    
-    # Matchup
-    'VS_OPP_AVG_PTS', 'OPP_DEF_STRENGTH_PTS', 'OPP_PACE', 'TEAM_PACE',
-    
-    # Advanced
-    'L5_WIN_PCT', 'L5_PLUS_MINUS'
-]
+# Everything train_all_models reads from the training data (targets, split/summary
+# columns and the union of the feature sets), so loading skips the other columns
+TRAINING_COLUMNS = list(dict.fromkeys(
+    ['GAME_DATE', 'PLAYER_NAME', 'PTS', 'REB', 'AST']
+    + POINTS_FEATURES + REBOUNDS_FEATURES + ASSISTS_FEATURES
+))
 
-REBOUNDS_FEATURES = [
-    # Core rebounds stats
-    'L5_REB', 'L10_REB', 'L10_REB_STD', 'RECENT_TREND_REB',
-    
-    # Context
-    'IS_HOME', 'REST_DAYS', 'IS_BACK_TO_BACK', 'IS_RESTED',
-    
-    # Minutes & Usage
-    'L5_MIN', 'L10_MIN', 'USAGE_RATE',
-    
-    # Supporting stats
-    'L5_PTS', 'L5_AST',
-    
-    # Matchup
-    'VS_OPP_AVG_REB', 'OPP_DEF_STRENGTH_REB', 'OPP_PACE', 'TEAM_PACE',
-    
-    # Advanced
-    'L5_WIN_PCT', 'L5_PLUS_MINUS'
-]
-
-ASSISTS_FEATURES = [
-    # Core assists stats
-    'L5_AST', 'L10_AST', 'L10_AST_STD', 'RECENT_TREND_AST',
-    
-    # Context
-    'IS_HOME', 'REST_DAYS', 'IS_BACK_TO_BACK', 'IS_RESTED',
-    
-    # Minutes & Usage
-    'L5_MIN', 'L10_MIN', 'USAGE_RATE',
-    
-    # Supporting stats
-    'L5_PTS', 'L5_REB',
-    
-    # Matchup
-    'VS_OPP_AVG_AST', 'OPP_DEF_STRENGTH_AST', 'OPP_PACE', 'TEAM_PACE',
-    
-    # Advanced
-    'L5_WIN_PCT', 'L5_PLUS_MINUS'
-]
+@lru_cache(maxsize=None)
+def select_device():
+    """
+    'cuda' if this XGBoost build can train on a visible GPU, otherwise 'cpu'
+    
+    Resolved once per process, from train_all_models rather than at import time:
+    the loky workers re-import this module and must not each rerun the probe.
+    """
+    if not xgb.build_info().get('USE_CUDA'):
+        return 'cpu'
+    try:
+        # CUDA builds silently fall back to CPU without a GPU; read back what was used
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            probe = xgb.train(
+                {'device': 'cuda', 'tree_method': 'hist'},
+                xgb.DMatrix(np.zeros((2, 1)), label=[0.0, 1.0]),
+                num_boost_round=1
+            )
+        device = json.loads(probe.save_config())['learner']['generic_param']['device']
+        return 'cuda' if device.startswith('cuda') else 'cpu'
+    except xgb.core.XGBoostError:
+        return 'cpu'
 
 # Best hyperparameters (tune these with optuna if you want even better results)
 BEST_PARAMS = {
+    'tree_method': 'hist',  # Histogram split finding (GPU histograms when device='cuda')
     'n_estimators': 1000,
     'learning_rate': 0.05,
     'max_depth': 5,
@@ -103,15 +77,20 @@ BEST_PARAMS = {
 
 def evaluate_model(y_true, y_pred, model_name="Model"):
     """Comprehensive model evaluation"""
-    mae = mean_absolute_error(y_true, y_pred)
-    rmse = np.sqrt(mean_squared_error(y_true, y_pred))
-    r2 = r2_score(y_true, y_pred)
+    y_true = np.asarray(y_true, dtype=np.float64)
     
-    # Accuracy within X points (crucial for props!)
-    within_1 = np.mean(np.abs(y_pred - y_true) < 1) * 100
-    within_2 = np.mean(np.abs(y_pred - y_true) < 2) * 100
-    within_3 = np.mean(np.abs(y_pred - y_true) < 3) * 100
-    within_5 = np.mean(np.abs(y_pred - y_true) < 5) * 100
+    # One residual and one |error| pass shared by every metric
+    diff = np.asarray(y_pred, dtype=np.float64) - y_true
+    abs_err = np.abs(diff)
+    sq_err = np.mean(diff * diff)
+    
+    mae = abs_err.mean()
+    rmse = np.sqrt(sq_err)
+    r2 = 1.0 - sq_err / np.var(y_true)
+    
+    # Accuracy within X points (crucial for props!), all thresholds in one broadcast compare
+    thresholds = np.array([1, 2, 3, 5], dtype=abs_err.dtype)
+    within_1, within_2, within_3, within_5 = (abs_err[:, None] < thresholds).mean(axis=0) * 100
     
     print(f"\n{'='*50}")
     print(f"📊 {model_name} - EVALUATION RESULTS")
@@ -139,40 +118,107 @@ def evaluate_model(y_true, y_pred, model_name="Model"):
 
 def plot_feature_importance(model, feature_names, target_name, top_n=15):
     """Display top N most important features"""
-    importance_df = pd.DataFrame({
-        'feature': feature_names,
-        'importance': model.feature_importances_
-    }).sort_values('importance', ascending=False)
+    # feature_importances_ recomputes the scores on every access: read it once
+    importances = model.feature_importances_
+    order = np.argsort(-importances, kind='stable')
+    names = np.asarray(feature_names, dtype=object)[order]
+    importances = importances[order]
+    
+    # Full ranking for the results JSON, built already sorted (no DataFrame sort)
+    importance_df = pd.DataFrame({'feature': names, 'importance': importances}, index=order)
+    
+    # Assemble all bar lines from the top of the plain arrays and print once
+    bar_lengths = (importances[:top_n] * 50).astype(np.intp)
+    lines = [
+        f"  {feature:25s} {'█' * bar_length} {importance:.4f}"
+        for feature, bar_length, importance in zip(names[:top_n], bar_lengths, importances[:top_n])
+    ]
     
     print(f"\n🔍 Top {top_n} Features for {target_name}:")
     print("-" * 50)
-    for idx, row in importance_df.head(top_n).iterrows():
-        bar_length = int(row['importance'] * 50)
-        bar = '█' * bar_length
-        print(f"  {row['feature']:25s} {bar} {row['importance']:.4f}")
+    print("\n".join(lines))
     print("-" * 50)
     
     return importance_df
 
 
+def output_paths(target_name, timestamp):
+    """Current model, archived model and results paths for one target's training run"""
+    prop = target_name.lower()
+    return {
+        'model': os.path.join(CURRENT_MODELS_DIR, f"{prop}_model.ubj"),
+        'archive': os.path.join(MODELS_DIR, f"archived/v{timestamp[:8]}/", f"{prop}_model_v{timestamp}.ubj"),
+        'results': os.path.join(RESULTS_DIR, f"{prop}_results.json"),
+    }
+
+
+def feature_matrix(df, feature_sets):
+    """
+    One contiguous float32 matrix over the union of every target's features
+    
+    Built once and shared by all targets and CV folds (joblib memory-maps large
+    arrays into the workers instead of pickling a copy per task). Returns the
+    matrix and a {feature: column position} map.
+    """
+    columns = list(dict.fromkeys(f for features in feature_sets for f in features))
+    X_all = np.ascontiguousarray(df[columns].to_numpy(dtype=np.float32))
+    return X_all, {col: i for i, col in enumerate(columns)}
+
+
+def time_series_folds(n_samples, n_splits):
+    """
+    (train, validation) row slices of the expanding-window folds TimeSeriesSplit makes
+    
+    Folds of time-sorted data are contiguous ranges, so slicing the arrays gives
+    zero-copy views instead of the fancy-indexed copies the index arrays produced.
+    """
+    test_size = n_samples // (n_splits + 1)
+    for test_start in range(n_samples - n_splits * test_size, n_samples, test_size):
+        yield slice(0, test_start), slice(test_start, test_start + test_size)
+
+
 def cross_validate_model(X, y, features, params, n_splits=5):
-    """Time Series Cross-Validation"""
+    """
+    Time Series Cross-Validation
+    
+    Folds are expanding windows, so the middle folds continue boosting the previous
+    fold's booster with CV_WARM_START_ESTIMATORS extra trees instead of refitting all
+    n_estimators from scratch. Every fold early-stops on its validation window.
+    
+    The last fold (fit on the most data) is refit from scratch: a warm-started
+    booster's tree count includes every earlier fold's trees, which were fit on
+    smaller windows, so only a from-scratch best_iteration says how many trees a
+    model trained directly on the data needs. That count is returned for the final
+    model.
+    """
     print(f"\n🔄 Running {n_splits}-Fold Time Series Cross-Validation...")
     
-    tscv = TimeSeriesSplit(n_splits=n_splits)
     cv_scores = []
+    prev_booster = None
+    warm_params = {**params, 'n_estimators': min(CV_WARM_START_ESTIMATORS, params['n_estimators'])}
     
-    for fold, (train_idx, val_idx) in enumerate(tscv.split(X), 1):
-        X_train_cv, X_val_cv = X.iloc[train_idx], X.iloc[val_idx]
-        y_train_cv, y_val_cv = y.iloc[train_idx], y.iloc[val_idx]
+    for fold, (train_rows, val_rows) in enumerate(time_series_folds(len(X), n_splits), 1):
+        X_train_cv, X_val_cv = X[train_rows], X[val_rows]
+        y_train_cv, y_val_cv = y[train_rows], y[val_rows]
         
-        model = xgb.XGBRegressor(**params)
+        if fold == n_splits:
+            # Last fold starts from scratch so its best_iteration is a true tree count
+            prev_booster = None
+        model = xgb.XGBRegressor(
+            **(params if prev_booster is None else warm_params),
+            early_stopping_rounds=EARLY_STOPPING_ROUNDS
+        )
         model.fit(
             X_train_cv, y_train_cv,
             eval_set=[(X_val_cv, y_val_cv)],
+            xgb_model=prev_booster,
             verbose=False
         )
+        # Continue the next fold from the best trees, not the stalled tail
+        best_rounds = model.best_iteration + 1
+        prev_booster = model.get_booster()[:best_rounds]
         
+        # predict() stops at best_iteration on its own
         preds = model.predict(X_val_cv)
         mae = mean_absolute_error(y_val_cv, preds)
         cv_scores.append(mae)
@@ -181,31 +227,36 @@ def cross_validate_model(X, y, features, params, n_splits=5):
     mean_cv_score = np.mean(cv_scores)
     std_cv_score = np.std(cv_scores)
     print(f"\n  Average CV MAE: {mean_cv_score:.3f} (+/- {std_cv_score:.3f})")
+    print(f"  Best number of trees: {best_rounds}")
     
-    return mean_cv_score, std_cv_score
+    return mean_cv_score, std_cv_score, best_rounds
 
 
-def train_prop_model(df, target_name, features, params):
-    """Train a model for a specific prop (PTS, REB, AST)"""
+def train_prop_model(df, target_name, features, params, X_all, column_index, split_index,
+                     paths, timestamp):
+    """
+    Train a model for a specific prop (PTS, REB, AST)
+    
+    df (GAME_DATE and the target column are enough) must already be sorted by GAME_DATE;
+    X_all/column_index come from feature_matrix and rows before split_index are the
+    training set. paths comes from output_paths, with the archive directory already created.
+    """
     print(f"\n{'#'*60}")
     print(f"# Training Model for: {target_name}")
     print(f"{'#'*60}")
     
-    # Sort by date
-    df = df.sort_values('GAME_DATE').reset_index(drop=True)
-    
-    # Prepare data
-    X = df[features].copy()
-    y = df[target_name].copy()
+    # Prepare data: this target's columns of the shared float32 matrix, gathered once
+    # into a contiguous block (every fit/predict below takes row slices of it), and a
+    # float32 label vector so XGBoost never has to convert either
+    X = np.ascontiguousarray(X_all[:, [column_index[f] for f in features]])
+    y = df[target_name].to_numpy(dtype=np.float32)
     
     # Train/Test split (chronological)
-    split_index = int(len(df) * TRAIN_SPLIT)
+    X_train, X_test = X[:split_index], X[split_index:]
+    y_train, y_test = y[:split_index], y[split_index:]
     
-    X_train, X_test = X.iloc[:split_index], X.iloc[split_index:]
-    y_train, y_test = y.iloc[:split_index], y.iloc[split_index:]
-    
-    train_end = df.iloc[split_index]['GAME_DATE'].date()
-    test_start = df.iloc[split_index]['GAME_DATE'].date()
+    # Read the one date cell directly (df.iloc[row] would box a whole mixed-dtype row)
+    train_end = test_start = df['GAME_DATE'].iloc[split_index].date()
     
     print(f"\n📅 Data Split:")
     print(f"  Training:   {len(X_train):,} samples (up to {train_end})")
@@ -213,25 +264,29 @@ def train_prop_model(df, target_name, features, params):
     print(f"  Features:   {len(features)}")
     
     # Cross-validation on training set
-    cv_mae, cv_std = cross_validate_model(X_train, y_train, features, params, n_splits=5)
-    
-    # Train final model
-    print(f"\n🚀 Training Final Model...")
-    model = xgb.XGBRegressor(**params)
-    
-    model.fit(
-        X_train, y_train,
-        eval_set=[(X_train, y_train), (X_test, y_test)],
-        verbose=False
-    )
-    
-    # Predictions
-    train_preds = model.predict(X_train)
+    cv_mae, cv_std, best_rounds = cross_validate_model(X_train, y_train, features, params, n_splits=5)
+    
+    # Train final model with the tree count CV early-stopped at (the test set is never
+    # used to pick it, so the test metrics stay honest)
+    print(f"\n🚀 Training Final Model ({best_rounds} trees)...")
+    final_params = {**params, 'n_estimators': best_rounds}
+    model = xgb.XGBRegressor(**final_params)
+    
+    # No eval_set: nothing reads per-round scores once the tree count is fixed
+    model.fit(X_train, y_train, verbose=False)
+    
+    # Predictions: the full test set, but only a fixed random sample of the training rows
+    # (sorted, so the gather stays sequential); the final model already has exactly the
+    # early-stopped tree count, so there is no tail of unused trees to skip
+    sample_size = min(TRAIN_EVAL_SAMPLES, len(X_train))
+    rng = np.random.default_rng(RANDOM_STATE)
+    sample_idx = np.sort(rng.choice(len(X_train), size=sample_size, replace=False))
+    train_preds = model.predict(X_train[sample_idx])
     test_preds = model.predict(X_test)
     
     # Evaluate
-    print(f"\n📈 Training Set Performance:")
-    train_metrics = evaluate_model(y_train, train_preds, f"{target_name} (Train)")
+    print(f"\n📈 Training Set Performance ({sample_size:,} sampled rows):")
+    train_metrics = evaluate_model(y_train[sample_idx], train_preds, f"{target_name} (Train)")
     
     print(f"\n🎯 Test Set Performance:")
     test_metrics = evaluate_model(y_test, test_preds, f"{target_name} (Test)")
@@ -239,21 +294,17 @@ def train_prop_model(df, target_name, features, params):
     # Feature importance
     importance_df = plot_feature_importance(model, features, target_name, top_n=15)
     
-    # Save model
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    date_stamp = datetime.now().strftime('%Y%m%d')
-    
-    # Save current model (actively used)
-    model_path = os.path.join(CURRENT_MODELS_DIR, f"{target_name.lower()}_model.json")
+    # Save model: current (actively used) plus a versioned backup; binary UBJ is much
+    # faster to write and load than JSON
+    model_path = paths['model']
+    versioned_path = paths['archive']
     
-    # Save versioned backup
-    archive_dir = os.path.join(MODELS_DIR, f"archived/v{date_stamp}/")
-    os.makedirs(archive_dir, exist_ok=True)
-    versioned_path = os.path.join(archive_dir, f"{target_name.lower()}_model_v{timestamp}.json")
+    # Fitted on numpy, so attach the feature names the inference code expects
+    model.get_booster().feature_names = list(features)
     
-    # Use get_booster() for compatibility
+    # Use get_booster() for compatibility; serialize once, then copy the file for the archive
     model.get_booster().save_model(model_path)
-    model.get_booster().save_model(versioned_path)
+    shutil.copyfile(model_path, versioned_path)
     
     print(f"\n💾 Model Saved:")
     print(f"  Current:  {model_path}")
@@ -264,20 +315,23 @@ def train_prop_model(df, target_name, features, params):
         'target': target_name,
         'timestamp': timestamp,
         'train_samples': len(X_train),
+        'train_eval_samples': sample_size,
         'test_samples': len(X_test),
         'features': features,
         'num_features': len(features),
-        'hyperparameters': params,
+        'hyperparameters': final_params,
         'cv_mae': cv_mae,
         'cv_std': cv_std,
+        'best_n_estimators': best_rounds,
         'train_metrics': train_metrics,
         'test_metrics': test_metrics,
         'feature_importance': importance_df.to_dict('records')
     }
     
-    results_path = os.path.join(RESULTS_DIR, f"{target_name.lower()}_results.json")
+    results_path = paths['results']
+    # Serialize in one shot and write once (json.dump streams many small writes)
     with open(results_path, 'w') as f:
-        json.dump(results, f, indent=2)
+        f.write(json.dumps(results, indent=2))
     
     print(f"  Results:  {results_path}")
     
@@ -291,56 +345,91 @@ def train_all_models():
     print("="*60)
     
     # Load data
-    print(f"\n📂 Loading data from: {DATA_PATH}")
-    df = pd.read_csv(DATA_PATH)
-    df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
+    data_path = latest_training_data_path()
+    print(f"\n📂 Loading data from: {data_path}")
+    # PLAYER_NAME as a categorical: counting players then only looks at the categories
+    if data_path.endswith('.feather'):
+        # features.py already writes it dictionary-encoded, so this is normally a no-op
+        df = pd.read_feather(data_path, columns=TRAINING_COLUMNS).astype({'PLAYER_NAME': 'category'})
+    else:
+        # Multithreaded pyarrow parser, only the needed columns, dates parsed on load
+        df = pd.read_csv(
+            data_path,
+            usecols=TRAINING_COLUMNS,
+            engine='pyarrow',
+            parse_dates=['GAME_DATE'],
+            dtype={'PLAYER_NAME': 'category'}
+        )
+    
+    # Sort by date once (stable, so same-day rows keep their file order); every
+    # target shares this chronological order and train/test split
+    df = df.sort_values('GAME_DATE', kind='stable').reset_index(drop=True)
+    split_index = int(len(df) * TRAIN_SPLIT)
+    
+    # The feather categorical can carry players dropped during cleaning; pruning them
+    # only scans the integer codes
+    df['PLAYER_NAME'] = df['PLAYER_NAME'].cat.remove_unused_categories()
     
     print(f"  Total samples: {len(df):,}")
     print(f"  Date range: {df['GAME_DATE'].min().date()} to {df['GAME_DATE'].max().date()}")
-    print(f"  Unique players: {df['PLAYER_NAME'].nunique()}")
+    print(f"  Unique players: {len(df['PLAYER_NAME'].cat.categories)}")
     
-    # Train models for each prop type
-    models = {}
-    all_metrics = {}
+    # Train models for each prop type in parallel (the three targets are independent)
+    prop_targets = [
+        ('PTS', POINTS_FEATURES),
+        ('REB', REBOUNDS_FEATURES),
+        ('AST', ASSISTS_FEATURES)
+    ]
     
-    # 1. Points Model
-    pts_model, pts_metrics = train_prop_model(df, 'PTS', POINTS_FEATURES, BEST_PARAMS)
-    models['PTS'] = pts_model
-    all_metrics['PTS'] = pts_metrics
+    # Feature data is converted to float32 once for all three targets and their folds
+    X_all, column_index = feature_matrix(df, [features for _, features in prop_targets])
     
-    # 2. Rebounds Model
-    reb_model, reb_metrics = train_prop_model(df, 'REB', REBOUNDS_FEATURES, BEST_PARAMS)
-    models['REB'] = reb_model
-    all_metrics['REB'] = reb_metrics
+    # Split cores between the workers so XGBoost threads don't oversubscribe; leftover
+    # cores go to the first targets (PTS has the most features) instead of idling
+    base_threads, extra_threads = divmod(os.cpu_count() or 1, len(prop_targets))
+    thread_counts = [max(1, base_threads + (i < extra_threads)) for i in range(len(prop_targets))]
     
-    # 3. Assists Model
-    ast_model, ast_metrics = train_prop_model(df, 'AST', ASSISTS_FEATURES, BEST_PARAMS)
-    models['AST'] = ast_model
-    all_metrics['AST'] = ast_metrics
+    # One timestamp for the whole run: all output paths are built (and the archive
+    # directory created) once, before any worker starts
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    paths = {target: output_paths(target, timestamp) for target, _ in prop_targets}
+    os.makedirs(os.path.dirname(paths['PTS']['archive']), exist_ok=True)
+    
+    # The device is probed once here and travels to the workers inside params
+    params = {**BEST_PARAMS, 'device': select_device()}
+    
+    trained = Parallel(n_jobs=len(prop_targets), backend='loky')(
+        delayed(train_prop_model)(
+            # Features travel in the shared X_all; each task only needs its target and dates
+            df[['GAME_DATE', target]], target, features, {**params, 'n_jobs': n_jobs},
+            X_all, column_index, split_index, paths[target], timestamp
+        )
+        for (target, features), n_jobs in zip(prop_targets, thread_counts)
+    )
+    
+    models = {}
+    all_metrics = {}
+    for (target, _), (model, metrics) in zip(prop_targets, trained):
+        models[target] = model
+        all_metrics[target] = metrics
     
     # Summary
     print("\n" + "="*60)
     print("📊 TRAINING COMPLETE - SUMMARY")
     print("="*60)
     
+    # One array per column, pulled from the metrics in a single pass per metric
+    keys = ('PTS', 'REB', 'AST')
+    mae_arr, r2_arr, w3_arr = (
+        np.fromiter((all_metrics[k][metric] for k in keys), dtype=np.float64, count=len(keys))
+        for metric in ('mae', 'r2', 'within_3')
+    )
     summary_df = pd.DataFrame({
         'Prop': ['Points', 'Rebounds', 'Assists'],
-        'Target': ['PTS', 'REB', 'AST'],
-        'Test MAE': [
-            all_metrics['PTS']['mae'],
-            all_metrics['REB']['mae'],
-            all_metrics['AST']['mae']
-        ],
-        'Test R²': [
-            all_metrics['PTS']['r2'],
-            all_metrics['REB']['r2'],
-            all_metrics['AST']['r2']
-        ],
-        'Within 3': [
-            f"{all_metrics['PTS']['within_3']:.1f}%",
-            f"{all_metrics['REB']['within_3']:.1f}%",
-            f"{all_metrics['AST']['within_3']:.1f}%"
-        ]
+        'Target': list(keys),
+        'Test MAE': mae_arr,
+        'Test R²': r2_arr,
+        'Within 3': np.char.add(np.char.mod('%.1f', w3_arr), '%')
     })
     
     print(summary_df.to_string(index=False))